@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+
+"""
+Performance benchmarks of django-powerpages (not a part of the package).
+Run with: python setup.py benchmark
+"""
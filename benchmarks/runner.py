@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmarks of page serving, URL reversing, sitemap generation
+and template loader chain resolution.
+Results (wall time and number of queries) are given as JSON document,
+allowing to compare them between commits.
+"""
+
+from __future__ import unicode_literals
+
+import json
+import platform
+import random
+import subprocess
+import timeit
+
+import django
+from django.db import connection
+from django.core.cache import cache
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.core.management import call_command
+
+from powerpages import template_cache
+from powerpages.models import Page
+from powerpages.reverse import reverse_url
+from powerpages.sitemap import PageSitemap
+
+from benchmarks.sitegen import generate_site
+
+
+DEFAULTS = {
+    'nodes': 500,
+    'depth': 4,
+    'template_size': 2000,
+    'alias_ratio': 0.3,
+    'redirect_ratio': 0.05,
+    'cache_ratio': 0.5,
+    'requests': 200,
+    'seed': 1,
+}
+
+
+def clear_caches():
+    """Clears shared cache and process-local compiled templates"""
+    cache.clear()
+    template_cache.compiled_templates.clear()
+
+
+def percentile(values, fraction):
+    """Value below which given fraction of sorted values falls"""
+    index = min(len(values) - 1, int(round(fraction * (len(values) - 1))))
+    return values[index]
+
+
+def measure(func, samples):
+    """
+    Calls func for each sample, records wall time and number of queries.
+    Returns summary of measurements.
+    """
+    durations, queries = [], []
+    for sample in samples:
+        with CaptureQueriesContext(connection) as context:
+            start = timeit.default_timer()
+            func(sample)
+            durations.append(timeit.default_timer() - start)
+        queries.append(len(context.captured_queries))
+    durations.sort()
+    total = sum(durations)
+    return {
+        'count': len(durations),
+        'total': total,
+        'mean': total / len(durations),
+        'p50': percentile(durations, 0.5),
+        'p95': percentile(durations, 0.95),
+        'max': durations[-1],
+        'ops_per_second': len(durations) / total if total else None,
+        'queries_mean': float(sum(queries)) / len(queries),
+        'queries_max': max(queries),
+    }
+
+
+def bench_page_view(urls):
+    """`views.page` latency with cold and warm caches"""
+    client = Client()
+
+    def cold_request(url):
+        clear_caches()
+        client.get(url)
+
+    def warm_request(url):
+        client.get(url)
+
+    results = {'page_view_cold': measure(cold_request, urls)}
+    for url in set(urls):
+        client.get(url)
+    results['page_view_warm'] = measure(warm_request, urls)
+    return results
+
+
+def bench_reverse_url(aliases):
+    """`reverse_url` throughput with cold and warm caches"""
+    clear_caches()
+    results = {'reverse_url_cold': measure(reverse_url, aliases)}
+    results['reverse_url_warm'] = measure(reverse_url, aliases)
+    return results
+
+
+def bench_sitemap(repeat):
+    """Generation of all URLs by PageSitemap"""
+
+    def generate(_):
+        list(PageSitemap().get_urls())
+
+    clear_caches()
+    return {'sitemap': measure(generate, range(repeat))}
+
+
+def bench_loader_chain(pages):
+    """Rendering of the deepest Pages, including loading of their ancestors"""
+
+    def render(page):
+        clear_caches()
+        page_processor = page.get_page_processor()
+        page_processor.render(
+            page_processor.create_context({'website_page': page})
+        )
+
+    return {'loader_chain': measure(render, pages)}
+
+
+def git_commit():
+    """Current GIT commit of the repository (if available)"""
+    try:
+        output = subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], stderr=subprocess.STDOUT
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.decode('ascii').strip()
+
+
+def run(**options):
+    """Generates the website and runs all benchmarks"""
+    parameters = DEFAULTS.copy()
+    parameters.update(
+        (name, value) for name, value in options.items() if value is not None
+    )
+    call_command('migrate', verbosity=0)
+    pages = generate_site(
+        nodes=parameters['nodes'],
+        depth=parameters['depth'],
+        template_size=parameters['template_size'],
+        alias_ratio=parameters['alias_ratio'],
+        redirect_ratio=parameters['redirect_ratio'],
+        cache_ratio=parameters['cache_ratio'],
+        seed=parameters['seed'],
+    )
+    rng = random.Random(parameters['seed'])
+    content_pages = [
+        page for page in pages
+        if page.page_processor == 'powerpages.DefaultPageProcessor'
+    ]
+    urls = [
+        rng.choice(pages).url for i in range(parameters['requests'])
+    ]
+    aliases = [
+        rng.choice([page.alias for page in pages if page.alias])
+        for i in range(parameters['requests'])
+    ]
+    deepest_pages = sorted(
+        content_pages, key=lambda page: page.url.count('/'), reverse=True
+    )[:max(1, parameters['requests'] // 10)]
+    results = {}
+    with override_settings(ALLOWED_HOSTS=['testserver']):
+        results.update(bench_page_view(urls))
+    results.update(bench_reverse_url(aliases))
+    results.update(bench_sitemap(max(1, parameters['requests'] // 50)))
+    results.update(bench_loader_chain(deepest_pages))
+    return {
+        'environment': {
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'commit': git_commit(),
+            'pages': Page.objects.count(),
+        },
+        'parameters': parameters,
+        'results': results,
+    }
+
+
+def main(output=None, **options):
+    """Runs benchmarks, writes results as JSON to given file or stdout"""
+    report = json.dumps(run(**options), indent=2, sort_keys=True)
+    if output:
+        with open(output, 'w') as f:
+            f.write(report)
+    else:
+        print(report)
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+"""
+Generator of synthetic websites (trees of Pages) for benchmarks.
+"""
+
+from __future__ import unicode_literals
+
+import random
+
+from django.core.cache import cache
+
+from powerpages.models import Page, get_sitemap_fields
+from powerpages.sitemap_entries import rebuild_entries
+from powerpages import sitemap_config
+
+
+LOREM = (
+    'Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do '
+    'eiusmod tempor incididunt ut labore et dolore magna aliqua. '
+)
+
+ROOT_TEMPLATE = (
+    '<!DOCTYPE html>\n<html><head><title>{{ website_page.title }}</title>'
+    '</head>\n<body>{% block content %}{% endblock %}</body></html>\n'
+)
+
+
+def filler(size):
+    """Paragraph of text of given size"""
+    text = LOREM * (size // len(LOREM) + 1)
+    return '<p>{0}</p>\n'.format(text[:size])
+
+
+def page_template(rng, aliases, template_size, links):
+    """Template source of non-root Page"""
+    parts = ['{% block content %}{{ block.super }}\n']
+    for alias in rng.sample(aliases, min(links, len(aliases))):
+        parts.append('<a href="{{% page_url {0} %}}">{0}</a>\n'.format(alias))
+    parts.append(filler(template_size))
+    parts.append('{% endblock %}\n')
+    return ''.join(parts)
+
+
+def generate_site(nodes=500, depth=4, template_size=2000, alias_ratio=0.3,
+                  redirect_ratio=0.05, cache_ratio=0.5, links=5, seed=1):
+    """
+    Creates tree of `nodes` Pages (including root), not deeper than `depth`.
+    Part of Pages have aliases (linked from other Pages using
+    {% page_url %} tag), part of them are redirects and part of them
+    are cached.
+    Returns list of created Pages.
+    """
+    rng = random.Random(seed)
+    pages = [
+        Page(
+            url='/', alias='page-0', title='Home', template=ROOT_TEMPLATE
+        )
+    ]
+    levels = {'/': 0}
+    aliases = ['page-0']
+    content_urls = ['/']
+    for i in range(1, nodes):
+        parent_url = rng.choice(
+            [url for url in content_urls if levels[url] < depth]
+        )
+        url = '{0}p{1}/'.format(parent_url, i)
+        levels[url] = levels[parent_url] + 1
+        page = Page(url=url, title='Page {0}'.format(i))
+        if rng.random() < alias_ratio:
+            page.alias = 'page-{0}'.format(i)
+        if rng.random() < redirect_ratio:
+            page.page_processor = 'powerpages.RedirectProcessor'
+            page.page_processor_config = {
+                'to url': rng.choice(content_urls)
+            }
+        else:
+            page.template = page_template(
+                rng, aliases, template_size, links
+            )
+            if rng.random() < cache_ratio:
+                page.page_processor_config = {'cache': 300}
+            content_urls.append(url)
+        if page.alias:
+            aliases.append(page.alias)
+        pages.append(page)
+    for page in pages:  # bulk_create doesn't call save()
+        for field_name, value in get_sitemap_fields(page).items():
+            setattr(page, field_name, value)
+    Page.objects.bulk_create(pages, batch_size=500)
+    # bulk_create doesn't send signals:
+    for sitemap_class in sitemap_config.sitemaps.incremental_sitemaps():
+        rebuild_entries(sitemap_class)
+    cache.clear()
+    return list(Page.objects.order_by('pk'))
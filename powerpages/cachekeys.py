@@ -10,6 +10,10 @@ from django.utils import six
 
 URL_LIST_CACHE = 'powerpages:url_list'
 SITEMAP_CONTENT = 'powerpages:sitemap'
+# Generation counter bumped on every Page save / delete:
+PAGES_GENERATION = 'powerpages:generation'
+# Generation counter bumped on every change of incremental sitemap entries:
+SITEMAP_GENERATION = 'powerpages:sitemap_generation'
 
 
 def get_cache_name(prefix, name):
@@ -29,14 +33,46 @@ def template_source(page_pk):
     return 'powerpages:template:{0}'.format(page_pk)
 
 
-def rendered_source_for_user(page_pk, user_id):
-    """Create cache key for rendered page source based on current user"""
-    return 'powerpages:rendered_source_user:{0}:{1}'.format(page_pk, user_id)
+def page_version(page_pk):
+    """Create cache key for version counter of the page"""
+    return 'powerpages:version:{0}'.format(page_pk)
 
 
-def rendered_source_for_lang(page_pk, lang):
-    """Create cache key for rendered page source based on current language"""
-    return 'powerpages:rendered_source_lang:{0}:{1}'.format(page_pk, lang)
+def rendered_source_for_user(page_pk, user_id, version=''):
+    """
+    Create cache key for rendered page source based on current user
+    and version token of the page
+    """
+    return 'powerpages:rendered_source_user:{0}:{1}:{2}'.format(
+        page_pk, user_id, version
+    )
+
+
+def rendered_source_for_lang(page_pk, lang, version=''):
+    """
+    Create cache key for rendered page source based on current language
+    and version token of the page
+    """
+    return 'powerpages:rendered_source_lang:{0}:{1}:{2}'.format(
+        page_pk, lang, version
+    )
+
+
+def sitemap_content(protocol, host, generation='', shard=''):
+    """
+    Create cache key for rendered sitemap (or its shard) based on protocol
+    and host of the request and generation of Pages
+    """
+    return '{0}:{1}:{2}:{3}:{4}'.format(
+        SITEMAP_CONTENT, protocol, hashlib.md5(
+            six.text_type(host).encode('utf-8')
+        ).hexdigest(), generation, shard
+    )
+
+
+def regeneration_lock(cache_key):
+    """Create cache key for lock held while regenerating cached content"""
+    return '{0}:lock'.format(cache_key)
 
 
 def url_cache(name, *args, **kwargs):
@@ -9,6 +9,9 @@ from django.contrib.auth.models import AnonymousUser
 import yaml
 
 from powerpages.models import Page
+from powerpages.redirects import follow_chain, RedirectLoop
+from powerpages.routing import PageRoutingTable
+from powerpages.utils.class_registry.dbfields import load_yaml
 from powerpages.widgets import SourceCodeEditor
 from powerpages.sync import normalize_page_fields
 
@@ -55,8 +58,8 @@ class PageAdminForm(forms.ModelForm):
         ).strip() or None
         if value:
             try:
-                value = yaml.load(value)
-            except ValueError:
+                value = load_yaml(value)
+            except (ValueError, yaml.YAMLError):
                 raise forms.ValidationError('Invalid YAML config.')
             else:
                 if not isinstance(value, dict):
@@ -84,8 +87,20 @@ class PageAdminForm(forms.ModelForm):
         try:
             processor = instance.get_page_processor()
             processor.validate(request=request)
+            if hasattr(processor, 'get_redirect'):
+                self.validate_redirect_chain(instance)
         finally:
             # Restore instance to state existing before the validation:
             for name, value in original_attrs.items():
                 setattr(instance, name, value)
         return normalized_data
+
+    def validate_redirect_chain(self, instance):
+        """Checks if redirect Page doesn't lead to a loop of redirects"""
+        redirects = PageRoutingTable().build_redirects_with_page(instance)
+        try:
+            follow_chain(instance.url, redirects)
+        except RedirectLoop as e:
+            raise forms.ValidationError(
+                'Redirect loop detected: {0}'.format(e)
+            )
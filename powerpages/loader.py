@@ -2,20 +2,96 @@
 
 from __future__ import unicode_literals
 
-from django.template import TemplateDoesNotExist
+import contextlib
+import threading
+
+from django.template import TemplateDoesNotExist, Origin
 from django.template.loaders.base import Loader
 from django.core.cache import cache
+from django.utils import six
 
 from powerpages.models import Page
+from powerpages import template_cache
 from powerpages import cachekeys
 
 
+_thread_locals = threading.local()
+
+
+def fetch_template_sources(pages):
+    """
+    Retrieves mapping: Page pk -> template source for given Pages.
+    Sources are read from cache using single `get_many`,
+    missing ones are generated and stored using single `set_many`.
+    """
+    cachekey_to_page = dict(
+        (cachekeys.template_source(page.pk), page) for page in pages
+    )
+    cached_sources = cache.get_many(list(cachekey_to_page))
+    missing_sources = {}
+    for cachekey, page in cachekey_to_page.items():
+        if cachekey not in cached_sources:
+            page_processor = page.get_page_processor()
+            missing_sources[cachekey] = page_processor.get_template_source()
+    if missing_sources:
+        cache.set_many(missing_sources)
+    cached_sources.update(missing_sources)
+    return dict(
+        (six.text_type(page.pk), cached_sources[cachekey])
+        for cachekey, page in cachekey_to_page.items()
+    )
+
+
+@contextlib.contextmanager
+def primed_pages(pages):
+    """
+    Makes templates of given Pages available to WebsiteLoader
+    in current thread, so they are loaded without database queries
+    and separate cache lookups.
+    """
+    previous_sources = getattr(_thread_locals, 'sources', None)
+    _thread_locals.sources = dict(previous_sources or {})
+    _thread_locals.sources.update(fetch_template_sources(pages))
+    try:
+        yield
+    finally:
+        _thread_locals.sources = previous_sources
+
+
+def get_primed_source(page_pk):
+    """Retrieves template source primed for current thread or None"""
+    sources = getattr(_thread_locals, 'sources', None) or {}
+    return sources.get(six.text_type(page_pk))
+
+
 class WebsiteLoader(Loader):
     """
     A custom template loader to load Page templates from the database.
     Inspired by https://github.com/jezdez/django-dbtemplates/
     """
 
+    def load_template(self, template_name, template_dirs=None):
+        """
+        Returns compiled template, reusing templates compiled earlier
+        for the same Page and source.
+        """
+        source, display_name = self.load_template_source(
+            template_name, template_dirs
+        )
+        page_pk = template_name.split('/')[1]
+        origin = Origin(
+            name=display_name, template_name=template_name, loader=self
+        )
+        try:
+            template = template_cache.get_template(
+                page_pk, source, origin, template_name, self.engine
+            )
+        except TemplateDoesNotExist:
+            # the same fallback as in the base Loader.load_template
+            return source, display_name
+        else:
+            return template, None
+
     def load_template_source(self, template_name, template_dirs=None):
         """Load templates from powerpages.Page model instances.
         Works only with templates named:
@@ -28,7 +104,9 @@ class WebsiteLoader(Loader):
             if namespace == 'page':
                 cachekey = cachekeys.template_source(page_pk)
                 display_name = "page:%s" % page_pk
-                source = cache.get(cachekey)
+                source = get_primed_source(page_pk)
+                if source is None:
+                    source = cache.get(cachekey)
                 if source is None:
                     try:
                         page = Page.objects.get(pk=page_pk)
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+from django.core.management.base import BaseCommand, CommandError
+
+from powerpages.redirects import find_chains
+from powerpages.routing import PageRoutingTable
+
+
+class Command(BaseCommand):
+    """REPORTS chains and loops of redirect Pages"""
+
+    help = (
+        "Reports redirect Pages pointing at other redirect Pages "
+        "(served as single redirect to the final target) and loops."
+    )
+
+    def handle(self, *args, **options):
+        """Performs the operation"""
+        routing_table = PageRoutingTable()
+        redirects = routing_table.build_redirects(routing_table.build())
+        chains = loops = 0
+        for chain, is_loop in find_chains(redirects):
+            if is_loop:
+                loops += 1
+                self.stdout.write('LOOP: {0}'.format(' -> '.join(chain)))
+            else:
+                chains += 1
+                self.stdout.write('CHAIN: {0}'.format(' -> '.join(chain)))
+        self.stdout.write(
+            'SUMMARY: {0} chain(s), {1} loop(s)'.format(chains, loops)
+        )
+        if loops:
+            raise CommandError('Redirect loops found!')
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+from django.core.management.base import BaseCommand, CommandError
+
+from powerpages.render import WebsiteRenderOperation
+
+
+class Command(BaseCommand):
+    """RENDERS website Pages TO static HTML files"""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            default=False,
+            dest='dry_run',
+            help=(
+                "Shows pages to be rendered without changing anything in the "
+                "file system."
+            )
+        ),
+        parser.add_argument(
+            '--quiet',
+            action='store_true',
+            default=False,
+            dest='quiet',
+            help=(
+                "Limits displayed output to summary of changes"
+            )
+        ),
+        parser.add_argument(
+            '-f', '--force',
+            action='store_true',
+            default=False,
+            dest='force',
+            help="Renders all pages, including not changed ones."
+        ),
+        parser.add_argument(
+            '-p', '--processes',
+            type=int,
+            default=None,
+            dest='processes',
+            help="Number of worker processes (default: number of CPUs)."
+        )
+
+    def handle(self, root_url='/', stdout=None, stderr=None, **options):
+        """Performs the operation"""
+        operation = WebsiteRenderOperation(
+            root_url=root_url, error_class=CommandError,
+            stdout=self.stdout, stderr=self.stderr, **options
+        )
+        return operation.run()
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+from django.test import RequestFactory
+from django.core.management.base import BaseCommand, CommandError
+
+from powerpages.settings import app_settings
+from powerpages.sitemap_cache import rebuild_sitemap
+from powerpages.sitemap_files import write_sitemaps
+from powerpages.sitemap_entries import rebuild_entries
+from powerpages.sitemap_config import sitemaps
+
+
+class Command(BaseCommand):
+    """REBUILDS cached sitemap.xml or WRITES it to files"""
+
+    help = (
+        "Renders sitemap.xml for given hosts and stores it in the cache, "
+        "so it's not rendered when requested by crawlers. "
+        "With --write option sitemap files (with gzipped versions) "
+        "are written to POWER_PAGES['SITEMAP_DIRECTORY'] (separately for "
+        "each protocol and host) and served from there. "
+        "With --rebuild-entries option stored entries of incremental "
+        "sitemaps are rebuilt first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'hosts',
+            nargs='*',
+            help="Hosts the sitemap is requested on (eg. www.example.com)."
+        )
+        parser.add_argument(
+            '--https',
+            action='store_true',
+            default=False,
+            dest='https',
+            help="Sitemap is requested using HTTPS."
+        )
+        parser.add_argument(
+            '-w', '--write',
+            action='store_true',
+            default=False,
+            dest='write',
+            help="Writes sitemap files to POWER_PAGES['SITEMAP_DIRECTORY']."
+        )
+        parser.add_argument(
+            '--rebuild-entries',
+            action='store_true',
+            default=False,
+            dest='rebuild_entries',
+            help=(
+                "Rebuilds stored entries of incremental sitemaps "
+                "from their source objects."
+            )
+        )
+
+    def handle(self, *args, **options):
+        """Performs the operation"""
+        if not options['hosts'] and not options['rebuild_entries']:
+            raise CommandError('At least one host is required!')
+        if options['write']:
+            if not app_settings.SITEMAP_DIRECTORY:
+                raise CommandError(
+                    "POWER_PAGES['SITEMAP_DIRECTORY'] setting is not defined!"
+                )
+        if options['rebuild_entries']:
+            for sitemap_class in sitemaps.incremental_sitemaps():
+                self.stdout.write('ENTRIES: {0} ({1})'.format(
+                    sitemap_class.get_section(), rebuild_entries(sitemap_class)
+                ))
+        for host in options['hosts']:
+            request = RequestFactory(SERVER_NAME=host).get(
+                '/sitemap.xml', secure=options['https']
+            )
+            if options['write']:
+                for file_name in write_sitemaps(
+                    request, app_settings.SITEMAP_DIRECTORY
+                ):
+                    self.stdout.write('WRITTEN: {0}://{1}/{2}'.format(
+                        request.scheme, host, file_name
+                    ))
+            else:
+                content = rebuild_sitemap(request)
+                self.stdout.write(
+                    'REBUILT: {0}://{1} ({2} bytes)'.format(
+                        request.scheme, host, len(content.encode('utf-8'))
+                    )
+                )
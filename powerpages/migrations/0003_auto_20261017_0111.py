@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.8 on 2026-10-17 01:11
+from __future__ import unicode_literals
+
+import datetime
+
+import yaml
+
+from django.db import migrations, models
+from django.utils import six
+
+
+# Frozen copy of sitemap settings handling (powerpages.models and
+# powerpages.sitemap_config) as of this migration:
+
+VALID_CHANGEFREQ = (
+    '', 'always', 'hourly', 'daily', 'weekly', 'monthly', 'yearly', 'never',
+)
+
+# page processors which Pages are not accessible on their URLs:
+NOT_ACCESSIBLE_PROCESSORS = ('powerpages.NotFoundProcessor',)
+
+
+class ConfigLoader(yaml.SafeLoader):
+    """Safe YAML loader accepting string tags emitted by Python 2 dumper"""
+
+
+ConfigLoader.add_constructor(
+    'tag:yaml.org,2002:python/unicode', ConfigLoader.construct_yaml_str
+)
+ConfigLoader.add_constructor(
+    'tag:yaml.org,2002:python/str', ConfigLoader.construct_yaml_str
+)
+
+
+def load_config(value):
+    """Decodes page processor config stored as YAML document"""
+    if isinstance(value, six.string_types):
+        try:
+            value = yaml.load(value, Loader=ConfigLoader)
+        except yaml.YAMLError:
+            value = None
+    return value if isinstance(value, dict) else {}
+
+
+def parse_sitemap_settings(sitemap_settings):
+    """
+    Converts `sitemap` config option into dictionary of valid values
+    or None if the Page is not visible in the sitemap.
+    """
+    if sitemap_settings is not None and not sitemap_settings:
+        return None
+    conf_item = {}
+    if isinstance(sitemap_settings, dict):
+        if 'lastmod' in sitemap_settings:
+            try:
+                lastmod = datetime.datetime.strptime(
+                    six.text_type(sitemap_settings['lastmod']), '%Y-%m-%d'
+                )
+            except ValueError:
+                pass
+            else:
+                conf_item['lastmod'] = lastmod.date()
+        if 'priority' in sitemap_settings:
+            try:
+                priority = float(sitemap_settings['priority'])
+            except (ValueError, TypeError):
+                pass
+            else:
+                conf_item['priority'] = priority
+        if 'changefreq' in sitemap_settings:
+            changefreq = sitemap_settings['changefreq']
+            if changefreq in VALID_CHANGEFREQ:
+                conf_item['changefreq'] = changefreq
+    return conf_item
+
+
+def get_sitemap_fields(page_processor, page_processor_config):
+    """Values of Page fields with denormalized sitemap settings"""
+    conf_item = None
+    if page_processor not in NOT_ACCESSIBLE_PROCESSORS:
+        conf_item = parse_sitemap_settings(
+            load_config(page_processor_config).get('sitemap')
+        )
+    return {
+        'sitemap_included': conf_item is not None,
+        'sitemap_lastmod': (conf_item or {}).get('lastmod'),
+        'sitemap_priority': (conf_item or {}).get('priority'),
+        'sitemap_changefreq': (conf_item or {}).get('changefreq'),
+    }
+
+
+def update_sitemap_fields(apps, schema_editor):
+    """
+    Denormalizes sitemap settings of existing Pages.
+    Pages using project-specific processors which are not accessible
+    are fixed on their next save.
+    """
+    Page = apps.get_model('powerpages', 'Page')
+    rows = Page.objects.values_list(
+        'pk', 'page_processor', 'page_processor_config'
+    )
+    for pk, page_processor, page_processor_config in rows.iterator():
+        Page.objects.filter(pk=pk).update(
+            **get_sitemap_fields(page_processor, page_processor_config)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('powerpages', '0002_auto_20170124_0055'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='page',
+            name='sitemap_changefreq',
+            field=models.CharField(editable=False, max_length=16, null=True),
+        ),
+        migrations.AddField(
+            model_name='page',
+            name='sitemap_included',
+            field=models.BooleanField(
+                db_index=True, default=True, editable=False
+            ),
+        ),
+        migrations.AddField(
+            model_name='page',
+            name='sitemap_lastmod',
+            field=models.DateField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='page',
+            name='sitemap_priority',
+            field=models.FloatField(editable=False, null=True),
+        ),
+        migrations.RunPython(
+            update_sitemap_fields, migrations.RunPython.noop
+        ),
+    ]
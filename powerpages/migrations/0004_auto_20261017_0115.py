@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.8 on 2026-10-17 01:15
+from __future__ import unicode_literals
+
+import datetime
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+# Frozen copy of entries of powerpages.sitemap.PageSitemap
+# as of this migration:
+
+PAGE_SECTION = 'page'
+
+
+def to_date(value):
+    """Date of `lastmod` given as date or datetime"""
+    if isinstance(value, datetime.datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        return value.date()
+    return value
+
+
+def create_page_entries(apps, schema_editor):
+    """Stores sitemap entries of existing Pages"""
+    Page = apps.get_model('powerpages', 'Page')
+    SitemapEntry = apps.get_model('powerpages', 'SitemapEntry')
+    rows = Page.objects.filter(sitemap_included=True).order_by(
+        'url'
+    ).values_list(
+        'pk', 'url', 'changed_at', 'sitemap_lastmod', 'sitemap_changefreq',
+        'sitemap_priority'
+    )
+    SitemapEntry.objects.bulk_create(
+        (
+            SitemapEntry(
+                section=PAGE_SECTION,
+                object_key='{0}'.format(pk),
+                location=url,
+                lastmod=to_date(sitemap_lastmod or changed_at),
+                changefreq=sitemap_changefreq,
+                priority=sitemap_priority,
+            )
+            for (
+                pk, url, changed_at, sitemap_lastmod, sitemap_changefreq,
+                sitemap_priority
+            ) in rows.iterator()
+        ),
+        batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('powerpages', '0003_auto_20261017_0111'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SitemapEntry',
+            fields=[
+                ('id', models.AutoField(
+                    auto_created=True, primary_key=True, serialize=False,
+                    verbose_name='ID'
+                )),
+                ('section', models.CharField(max_length=120)),
+                ('object_key', models.CharField(max_length=255)),
+                ('location', models.CharField(max_length=1024)),
+                ('lastmod', models.DateField(null=True)),
+                ('changefreq', models.CharField(max_length=16, null=True)),
+                ('priority', models.FloatField(null=True)),
+            ],
+            options={
+                'verbose_name': 'Sitemap Entry',
+                'verbose_name_plural': 'Sitemap Entries',
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='sitemapentry',
+            unique_together=set([('section', 'object_key')]),
+        ),
+        migrations.RunPython(
+            create_page_entries, migrations.RunPython.noop
+        ),
+    ]
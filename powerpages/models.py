@@ -4,19 +4,30 @@ from __future__ import unicode_literals
 
 from django.core.cache import cache
 from django.dispatch import receiver
-from django.db import models
+from django.db import models, transaction
 from django.utils.encoding import python_2_unicode_compatible
 
 from powerpages.settings import app_settings
+from powerpages.sitemap_config import parse_sitemap_settings
 from powerpages.utils.attribute_cache import cache_result_on
+from powerpages.utils.generation import bump_generation
+from powerpages.utils.class_registry.dbfields import RawConfig
 from powerpages.dbfields import (
     PageProcessorField, PageProcessorConfigField
 )
+from powerpages import template_cache
 from powerpages import cachekeys
 
 
 # Helpers:
 
+def get_parent_url(url):
+    """Generates URL of parent Page for given Page URL"""
+    parent_url = url[:-1] if url.endswith('/') else url
+    parent_url = parent_url.rsplit('/', 1)[0] + '/'
+    return parent_url if url != parent_url else ''
+
+
 class PageURLCache(object):
     """Helps to retrieve Page URL by alias using cache"""
 
@@ -54,6 +65,25 @@ class PageURLCache(object):
         return url
 
 
+def get_sitemap_fields(page):
+    """
+    Values of Page fields with denormalized sitemap settings,
+    based on accessibility and config of page processor.
+    """
+    page_processor = page.get_page_processor()
+    conf_item = None
+    if page_processor and page_processor.is_accessible():
+        conf_item = parse_sitemap_settings(
+            page_processor.config.get('sitemap')
+        )
+    return {
+        'sitemap_included': conf_item is not None,
+        'sitemap_lastmod': (conf_item or {}).get('lastmod'),
+        'sitemap_priority': (conf_item or {}).get('priority'),
+        'sitemap_changefreq': (conf_item or {}).get('changefreq'),
+    }
+
+
 # Models:
 
 @python_2_unicode_compatible
@@ -102,6 +132,15 @@ class Page(models.Model):
         verbose_name='Page Processor Config', null=True, blank=True,
         help_text='Advanced page configuration options as YAML config.'
     )
+    # Sitemap settings (denormalized on save from page processor config):
+    sitemap_included = models.BooleanField(
+        default=True, db_index=True, editable=False
+    )
+    sitemap_lastmod = models.DateField(null=True, editable=False)
+    sitemap_priority = models.FloatField(null=True, editable=False)
+    sitemap_changefreq = models.CharField(
+        max_length=16, null=True, editable=False
+    )
     # Indicates objects saved in Admin:
     is_dirty = models.BooleanField(default=False, editable=False)
     # Change info fields:
@@ -116,17 +155,28 @@ class Page(models.Model):
         """URL"""
         return self.url
 
+    def save(self, *args, **kwargs):
+        """Saves the Page, updates denormalized sitemap settings"""
+        config = self.__dict__.get('page_processor_config')
+        sitemap_fields = get_sitemap_fields(self)
+        if isinstance(config, RawConfig):
+            # not changed config is saved without encoding it again
+            self.__dict__['page_processor_config'] = config
+        for field_name, value in sitemap_fields.items():
+            setattr(self, field_name, value)
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = set(
+                kwargs['update_fields']
+            ).union(sitemap_fields)
+        super(Page, self).save(*args, **kwargs)
+
     def get_absolute_url(self):
         """URL"""
         return self.url
 
     def parent_url(self):
         """Generates parent Page URL"""
-        url = self.url
-        if url.endswith('/'):
-            url = url[:-1]
-        parent_url = url.rsplit('/', 1)[0] + '/'
-        return parent_url if self.url != parent_url else ''
+        return get_parent_url(self.url)
 
     @cache_result_on('_parent')
     def parent(self):
@@ -138,6 +188,33 @@ class Page(models.Model):
             parent_page = None
         return parent_page
 
+    def ancestors(self):
+        """
+        Parent, grandparent, etc. of the Page (nearest first),
+        the same chain as followed by parent() - fetched using single query.
+        Result of parent() is cached on all returned Pages.
+        """
+        urls = []
+        url = self.parent_url()
+        while url:
+            urls.append(url)
+            url = get_parent_url(url)
+        page_by_url = {}
+        if urls:
+            for page in Page.objects.filter(url__in=urls).order_by('pk'):
+                page_by_url.setdefault(page.url, page)
+        ancestors = []
+        page = self
+        for url in urls:
+            page._parent = page_by_url.get(url)
+            if page._parent is None:
+                break
+            ancestors.append(page._parent)
+            page = page._parent
+        else:
+            page._parent = None
+        return ancestors
+
     def children(self):
         """Direct descendant Pages based on URL"""
         url_regex = '^{url}[^/]+/?$'.format(url=self.url)
@@ -153,24 +230,83 @@ class Page(models.Model):
         page_processor = self.get_page_processor()
         return page_processor and page_processor.is_accessible()
 
+    def load_deferred_fields(self):
+        """Loads all deferred fields using single query"""
+        deferred_fields = self.get_deferred_fields()
+        if deferred_fields:
+            self.refresh_from_db(fields=deferred_fields)
+
     @models.permalink
     def get_admin_url(self):
         """URL of Page edition view in Admin"""
         return 'admin:powerpages_page_change', [self.pk]
 
 
+@python_2_unicode_compatible
+class SitemapEntry(models.Model):
+    """
+    Stored URL of incremental sitemap, updated when its source object
+    (eg. Page) changes.
+    """
+
+    class Meta:
+        verbose_name = 'Sitemap Entry'
+        verbose_name_plural = 'Sitemap Entries'
+        unique_together = (('section', 'object_key'),)
+
+    section = models.CharField(max_length=120)
+    object_key = models.CharField(max_length=255)
+    location = models.CharField(max_length=1024)
+    lastmod = models.DateField(null=True)
+    changefreq = models.CharField(max_length=16, null=True)
+    priority = models.FloatField(null=True)
+
+    def __str__(self):
+        """Location"""
+        return self.location
+
+
 # Signal Receivers:
 
 
-@receiver(models.signals.post_save, sender=Page)
-def page_changed(sender, **kwargs):
+def invalidate_page(page):
     """
-    post_save receiver for Page model:
+    Invalidates caches related to saved / deleted Page:
     * clears Page-related cache keys,
     * refresh mappings: alias <-> page real url,
-    * clears cache keys related to PageChanges.
+    * invalidates process-local routing tables,
+    * evicts compiled templates of the Page,
+    * invalidates rendered content of the Page and its descendants.
+    Inside a transaction caches are invalidated right away (for the current
+    transaction) and again after commit, so other processes never keep
+    data read before the commit.
     """
-    page = kwargs['instance']
-    cache_key = cachekeys.template_source(page.pk)
-    cache.delete(cache_key)
-    PageURLCache.refresh()
+    cache_keys = [cachekeys.template_source(page.pk)]
+    # template sources of children depend on existence of their parent:
+    cache_keys.extend(
+        cachekeys.template_source(child_pk)
+        for child_pk in page.children().values_list('pk', flat=True)
+    )
+
+    def invalidate():
+        cache.delete_many(cache_keys)
+        template_cache.evict(page.pk)
+        PageURLCache.refresh()
+        bump_generation(cachekeys.PAGES_GENERATION)
+        bump_generation(cachekeys.page_version(page.pk))
+
+    if transaction.get_connection().in_atomic_block:
+        invalidate()
+    transaction.on_commit(invalidate)
+
+
+@receiver(models.signals.post_save, sender=Page)
+def page_changed(sender, **kwargs):
+    """post_save receiver for Page model, invalidates Page-related caches"""
+    invalidate_page(kwargs['instance'])
+
+
+@receiver(models.signals.post_delete, sender=Page)
+def page_deleted(sender, **kwargs):
+    """post_delete receiver for Page model, invalidates Page-related caches"""
+    invalidate_page(kwargs['instance'])
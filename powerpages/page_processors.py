@@ -2,22 +2,37 @@
 
 from __future__ import unicode_literals
 
-import importlib
+import hashlib
+import time
+import timeit
 import traceback
 
 from django.utils import six
 from django.forms import ValidationError
 from django.core.urlresolvers import reverse
 from django.core.cache import cache
-from django.template import RequestContext, Context, Template
+from django.template import RequestContext, Context
 from django import http
 from django.conf import settings
 from django.utils.safestring import mark_safe
+from django.utils.encoding import force_bytes
+from django.utils.http import http_date, quote_etag
 
 from powerpages.utils.class_registry.item import ConfigurableClassRegistryItem
 from powerpages.utils.class_registry.config import ConfigVariable
+from powerpages.utils.http import datetime_to_timestamp, is_not_modified
+from powerpages.utils.imports import import_callable
+from powerpages.utils.attribute_cache import cache_result_on
+from powerpages.utils.generation import get_generations
+from powerpages.routing import routing_table
+from powerpages.templatetags.powerpages_tags import prefetch_constant_urls
 from powerpages.settings import app_settings
+from powerpages.signals import context_processor_executed
 from powerpages import page_processor_registry
+from powerpages import template_cache
+from powerpages import loader
+from powerpages import timing
+from powerpages import reverse as url_reverse
 from powerpages import cachekeys
 
 
@@ -26,6 +41,27 @@ def _get_cache_seconds(value):
     return settings.CACHE_MIDDLEWARE_SECONDS if value is True else int(value)
 
 
+def _validate_callables(dotted_paths):
+    """Checks if all dotted paths can be resolved to callables"""
+    errors = []
+    for dotted_path in dotted_paths:
+        if not isinstance(dotted_path, six.string_types):
+            errors.append(
+                '{0!r} is not a dotted path to a callable.'.format(
+                    dotted_path
+                )
+            )
+            continue
+        try:
+            import_callable(dotted_path)
+        except ImportError as e:
+            errors.append(
+                'Unable to import "{0}" ({1}).'.format(dotted_path, e)
+            )
+    if errors:
+        raise ValidationError(errors)
+
+
 class DefaultPageProcessor(ConfigurableClassRegistryItem):
     """Class responsible for rendering and validation of Pages."""
 
@@ -45,6 +81,17 @@ class DefaultPageProcessor(ConfigurableClassRegistryItem):
 * defaults to: `0` (no cache),
 * if value is set to `true` default cache validity time is used."
 (settings.CACHE_MIDDLEWARE_SECONDS).
+* cached content is invalidated when the page or its ancestors change
+and (if it contains URLs from `page_url` tag) when any page changes.
+            """,
+        ),
+        ConfigVariable(
+            'cache grace', converter=int, default=0,
+            help_text="""
+* default: `0`,
+* time in seconds after cache validity time, when expired content
+is still served while single worker generates the new one
+(protection against simultaneous regeneration of the page).
             """,
         ),
         ConfigVariable(
@@ -56,6 +103,7 @@ class DefaultPageProcessor(ConfigurableClassRegistryItem):
         ),
         ConfigVariable(
             'context processors', converter=list, default=list,
+            validators=[_validate_callables],
             help_text="""
 * default: `[]`,
 * list of context processor to be used in page template
@@ -88,25 +136,85 @@ sitemap settings: `changefreq`, `lastmod`, `priority`.
         )
     )
 
+    # Pages generation of URLs reversed by the last `render` call:
+    urls_generation = None
+
     @property
     def page(self):
         """Explicit alias for model instance"""
         return self.model_instance
 
     def process_request(self, request, extra_context=None):
-        """Main page processing logic"""
-        context = self.get_rendering_context(request)
-        if extra_context:
-            context.update(extra_context)
-        cache_key, seconds = self.get_cache_settings(request)
-        if cache_key:
-            content = cache.get(cache_key)
-            if content is None:
-                content = self.render(context)
-                cache.set(cache_key, content, seconds)
-        else:
+        """
+        Main page processing logic.
+        Cached content (together with its ETag) is used without building
+        the rendering context, HEAD requests never render cached pages.
+        """
+        timer = timing.get_timer(request)
+        is_head = request.method == 'HEAD'
+        with timer.phase('cache_get'):
+            cache_key, seconds = self.get_cache_settings(request)
+            if cache_key:
+                content, etag = self.get_cached_content(
+                    cache_key, allow_stale=is_head
+                )
+            else:
+                content, etag = None, None
+        if content is None and not (is_head and cache_key):
+            with timer.phase('context'):
+                context = self.get_rendering_context(request)
+                if extra_context:
+                    context.update(extra_context)
             content = self.render(context)
-        return self.create_response(request, content)
+            etag = self.get_etag(content)
+            if cache_key:
+                with timer.phase('cache_set'):
+                    self.set_cached_content(
+                        cache_key, content, etag, seconds,
+                        self.urls_generation
+                    )
+        return self.create_response(request, content, etag)
+
+    def get_cached_content(self, cache_key, allow_stale=False):
+        """
+        Retrieves pair (content, etag) from cache
+        or double None if content has to be generated.
+        Expired content (during `cache grace` period) is returned
+        to all workers except the one which acquired the lock
+        and should regenerate the content.
+        Content with URLs of Pages (`page_url` tag) is expired
+        when any Page changes.
+        """
+        cached = cache.get(cache_key)
+        if cached is None:
+            return None, None
+        content, etag, expires_at = cached[:3]
+        urls_generation = cached[3] if len(cached) > 3 else None
+        if urls_generation is not None and \
+                urls_generation != routing_table.get_generation():
+            expires_at = 0  # URLs of other Pages may have changed
+        if allow_stale or expires_at > time.time():
+            return content, etag
+        lock_key = cachekeys.regeneration_lock(cache_key)
+        if cache.add(lock_key, True, app_settings.CACHE_LOCK_SECONDS):
+            return None, None  # current worker regenerates the content
+        return content, etag
+
+    def set_cached_content(self, cache_key, content, etag, seconds,
+                           urls_generation=None):
+        """
+        Stores content in cache, together with its ETag, expiration time
+        and Pages generation of URLs reversed during rendering (if any).
+        Content is kept in cache for additional `cache grace` period.
+        """
+        grace = self.config.get('cache grace')
+        cache.set(
+            cache_key,
+            (content, etag, time.time() + seconds, urls_generation),
+            seconds + grace
+        )
+        if grace:
+            cache.delete(cachekeys.regeneration_lock(cache_key))
 
     def get_cache_settings(self, request):
         """
@@ -123,24 +231,71 @@ sitemap settings: `changefreq`, `lastmod`, `priority`.
                     user_id = None
             else:
                 user_id = None
+            version = self.get_cache_version()
             if user_id:
                 cache_key = cachekeys.rendered_source_for_user(
-                    self.page.pk, user_id
+                    self.page.pk, user_id, version
                 )
             else:  # for_lang
                 lang = request.LANGUAGE_CODE
                 cache_key = cachekeys.rendered_source_for_lang(
-                    self.page.pk, lang
+                    self.page.pk, lang, version
                 )
         else:
             cache_key, seconds = None, None
         return cache_key, seconds
 
+    @cache_result_on('_ancestor_pages')
+    def get_ancestor_pages(self):
+        """
+        Ancestors of the Page (routes or Page instances if routing table
+        is not available), retrieved once per processor instance.
+        """
+        pages = routing_table.get_ancestor_routes(self.page.url)
+        if pages is None:  # routing table is not available
+            pages = self.page.ancestors()
+        return pages
+
+    @cache_result_on('_cache_version')
+    def get_cache_version(self):
+        """
+        Version token of the Page and its ancestors (their templates
+        are inherited), changed when any of those Pages is saved or deleted
+        or when the chain of ancestors changes.
+        Allows to invalidate cached content of the whole subtree
+        by bumping version counter of single Page.
+        """
+        pages = self.get_ancestor_pages()
+        page_pks = [self.page.pk] + [page.pk for page in pages]
+        version_keys = [cachekeys.page_version(pk) for pk in page_pks]
+        generations = get_generations(version_keys)
+        token = ','.join(
+            '{0}.{1}'.format(page_pk, generations[version_key])
+            for page_pk, version_key in zip(page_pks, version_keys)
+        )
+        return hashlib.md5(token.encode('utf-8')).hexdigest()
+
     def render(self, context):
-        """Render Page using given context"""
-        source = self.get_template_source()
-        page_template = Template(source)
-        return page_template.render(context)
+        """
+        Render Page using given context.
+        Remembers Pages generation of URLs reversed during rendering
+        in `urls_generation` attribute (None if there were no URLs).
+        """
+        timer = timing.get_timer(getattr(context, 'request', None))
+        self.urls_generation = None
+        with url_reverse.pinned_generation(routing_table.get_generation()):
+            with timer.phase('compile'):
+                self.page.load_deferred_fields()
+                ancestors = self.page.ancestors()  # primes parent() of pages
+                source = self.get_template_source()
+                page_template = template_cache.get_template(
+                    self.page.pk, source
+                )
+            with timer.phase('render'), loader.primed_pages(ancestors):
+                prefetch_constant_urls(page_template)
+                content = page_template.render(context)
+            self.urls_generation = url_reverse.used_generation()
+            return content
 
     def validate(self, request=None):
         """Check validity of configuration and Page template"""
@@ -156,16 +311,60 @@ sitemap settings: `changefreq`, `lastmod`, `priority`.
             )
             raise ValidationError(mark_safe(msg))
 
-    def create_response(self, request, content):
+    def create_response(self, request, content, etag=None):
         """
         Creates HttpResponse and sets HTTP headers as defined in config.
+        Responds with 304 Not Modified if client's copy is still valid.
+        `content` may be None (HEAD request of cached page missing in cache)
+        - weak ETag based only on the version of the Page is used then,
+        `etag` is calculated if not given.
         """
-        response = http.HttpResponse(content)
+        if etag is None:
+            etag = self.get_etag(content)
+        last_modified = self.get_last_modified()
+        if is_not_modified(request, etag, last_modified):
+            response = http.HttpResponseNotModified()
+        else:
+            response = http.HttpResponse(content or '')
+        if etag:
+            response['ETag'] = (
+                quote_etag(etag) if content is not None else
+                'W/{0}'.format(quote_etag(etag))
+            )
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified)
         header_settings = self.config.get('headers')
         for key, value in header_settings.items():
             response[key] = value
         return response
 
+    def get_last_modified(self):
+        """
+        Timestamp of the latest change of the Page or its ancestors
+        (their templates are inherited). Given only for cached Pages,
+        content of other ones may change without changing the Pages
+        (they are validated using ETag based on the content).
+        """
+        if not self.config.get('cache'):
+            return None
+        pages = self.get_ancestor_pages()
+        changed_at = max(
+            [self.page.changed_at] + [page.changed_at for page in pages]
+        )
+        return datetime_to_timestamp(changed_at)
+
+    def get_etag(self, content):
+        """
+        ETag (not quoted) based on version of the Page and its ancestors
+        and the Page content (if given).
+        """
+        version = self.get_cache_version()
+        if content is None:
+            return version
+        return hashlib.md5(
+            force_bytes(version) + b':' + force_bytes(content)
+        ).hexdigest()
+
     def get_extra_context(self, request):
         """
         Get custom context function from config and try to update
@@ -173,11 +372,18 @@ sitemap settings: `changefreq`, `lastmod`, `priority`.
         """
         extra_context = {}
         context_processors = self.config.get('context processors')
+        timed = context_processor_executed.has_listeners(self.__class__)
         for context_processor in context_processors:
-            module_name, function_name = context_processor.rsplit('.', 1)
-            module = importlib.import_module(module_name)
-            context_processor_function = getattr(module, function_name)
+            context_processor_function = import_callable(context_processor)
+            if timed:
+                start = timeit.default_timer()
             extra_context.update(context_processor_function(request))
+            if timed:
+                context_processor_executed.send(
+                    self.__class__, page=self.page, request=request,
+                    context_processor=context_processor,
+                    duration=timeit.default_timer() - start
+                )
         return extra_context
 
     def create_request_context(self, request, data=None):
@@ -299,6 +505,51 @@ class RedirectProcessor(DefaultPageProcessor):
 
     def process_request(self, request, extra_context=None):
         """Redirection processing logic"""
+        location, permanent = self.get_redirect()
+        return self.create_redirect_response(location, permanent)
+
+    @staticmethod
+    def create_redirect_response(location, permanent):
+        """Creates 301 or 302 response"""
+        response_class = (
+            http.HttpResponsePermanentRedirect
+            if permanent else
+            http.HttpResponseRedirect
+        )
+        return response_class(location)
+
+    @classmethod
+    def has_default_response(cls):
+        """
+        Checks if the class creates redirect responses the default way,
+        so they can be created from precomputed (location, permanent)
+        without instantiating the processor (see routing table).
+        """
+        return (
+            six.get_unbound_function(cls.process_request) is
+            six.get_unbound_function(RedirectProcessor.process_request) and
+            cls.create_redirect_response is
+            RedirectProcessor.create_redirect_response
+        )
+
+    def has_static_location(self):
+        """
+        Checks if target location doesn't depend on the request
+        (URL reversed from `to name` depends on active language / urlconf).
+        """
+        return bool(
+            self.config.get('to alias') or self.config.get('to url') or
+            not self.config.get('to name')
+        )
+
+    def get_redirect(self, alias_urls=None):
+        """
+        Gets pair (location, permanent), falls back to temporary redirect
+        to "/" if target location can not be determined.
+        `alias_urls` - optional mapping: alias -> URL, used instead of
+        database queries.
+        """
+        self._alias_urls = alias_urls
         try:
             location = self.get_redirect_location()
         except:
@@ -306,12 +557,9 @@ class RedirectProcessor(DefaultPageProcessor):
             permanent = False
         else:
             permanent = self.config.get('permanent')
-        response_class = (
-            http.HttpResponsePermanentRedirect
-            if permanent else
-            http.HttpResponseRedirect
-        )
-        return response_class(location)
+        finally:
+            self._alias_urls = None
+        return location, permanent
 
     def get_redirect_location(self):
         """Gets target location."""
@@ -328,9 +576,16 @@ class RedirectProcessor(DefaultPageProcessor):
         """Location based on `alias` config option."""
         alias = self.config.get('to alias')
         if alias:
-            page_model = self.page.__class__
-            page = page_model.objects.get(alias=alias)
-            return page.url
+            return self._get_alias_url(alias)
+
+    def _get_alias_url(self, alias):
+        """URL of the Page with given alias"""
+        alias_urls = getattr(self, '_alias_urls', None)
+        if alias_urls is not None:
+            return alias_urls[alias]
+        page_model = self.page.__class__
+        page = page_model.objects.get(alias=alias)
+        return page.url
 
     def get_redirect_to_url(self):
         """Location based on `url` config option."""
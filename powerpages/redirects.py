@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+"""
+Analysis of redirect chains (redirect Pages pointing at other redirect
+Pages). Redirects are given as mapping: URL -> (location, permanent).
+"""
+
+from __future__ import unicode_literals
+
+
+class RedirectLoop(Exception):
+    """Chain of redirects leads back to already visited URL"""
+
+    def __init__(self, chain):
+        self.chain = chain
+        super(RedirectLoop, self).__init__(' -> '.join(chain))
+
+
+def follow_chain(url, redirects):
+    """
+    Follows redirects starting from given URL.
+    Returns pair: (list of URLs ending with final location, permanent),
+    redirect is permanent only if all redirects in the chain are permanent.
+    Raises RedirectLoop.
+    """
+    chain = [url]
+    location, permanent = redirects[url]
+    while location in redirects:
+        if location in chain:
+            raise RedirectLoop(chain + [location])
+        chain.append(location)
+        location, next_permanent = redirects[location]
+        permanent = permanent and next_permanent
+    chain.append(location)
+    return chain, permanent
+
+
+def collapse_redirects(redirects):
+    """
+    Replaces locations with final targets of redirect chains,
+    so only one hop is needed. Redirects leading to loops are not changed.
+    """
+    collapsed = {}
+    for url, redirect in redirects.items():
+        try:
+            chain, permanent = follow_chain(url, redirects)
+        except RedirectLoop:
+            collapsed[url] = redirect
+        else:
+            collapsed[url] = (chain[-1], permanent)
+    return collapsed
+
+
+def find_chains(redirects):
+    """
+    Generator over pairs (chain, is_loop) of redirects needing
+    more than one hop, ordered by URL.
+    """
+    for url in sorted(redirects):
+        try:
+            chain, permanent = follow_chain(url, redirects)
+        except RedirectLoop as e:
+            yield e.chain, True
+        else:
+            if len(chain) > 2:
+                yield chain, False
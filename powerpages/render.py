@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+
+"""
+Pre-rendering of website Pages into static HTML files,
+which can be served directly by the web server (eg. nginx).
+"""
+
+from __future__ import unicode_literals
+
+import os
+import json
+import codecs
+import traceback
+import collections
+import multiprocessing
+
+from django.conf import settings
+from django.db import connections
+from django.test import RequestFactory
+from django.contrib.auth.models import AnonymousUser
+
+from powerpages.models import Page, get_parent_url
+from powerpages.routing import routing_table
+from powerpages.settings import app_settings
+from powerpages.sync import BaseSyncOperation, SyncStatus
+from powerpages import page_processor_registry
+
+
+INDEX_FILE_NAME = 'index.html'
+MANIFEST_FILE_NAME = '.manifest.json'
+
+
+def url_to_file_path(url):
+    """Generates relative file system path of rendered Page"""
+    url_pieces = [slug for slug in url.split('/') if slug]
+    if not url_pieces or url.endswith('/'):
+        url_pieces.append(INDEX_FILE_NAME)
+    return os.sep.join(url_pieces)
+
+
+def is_renderable(page):
+    """
+    Determines if Page should be pre-rendered
+    (it's accessible, visible in sitemap and it's not a redirect)
+    """
+    if not page.sitemap_included:
+        return False
+    try:
+        processor_class = page_processor_registry.get(page.page_processor)
+    except page_processor_registry.registry.NotRegistered:
+        return False
+    return not hasattr(processor_class, 'get_redirect')
+
+
+def create_request(url):
+    """Creates anonymous GET request for given URL"""
+    request_factory = RequestFactory(
+        SERVER_NAME=app_settings.SITEMAP_DOMAIN or 'localhost'
+    )
+    request = request_factory.get(url)
+    request.session = {}
+    request.user = AnonymousUser()
+    request.LANGUAGE_CODE = settings.LANGUAGE_CODE
+    return request
+
+
+def render_page(url):
+    """
+    Renders Page with given URL (function executed by worker processes).
+    Gives triple (url, content, error), `content` is None on failure.
+    """
+    try:
+        page = routing_table.get_page(url)
+        response = page.get_page_processor().process_request(
+            create_request(url)
+        )
+        if response.status_code != 200:
+            return url, None, 'Response status: {0}'.format(
+                response.status_code
+            )
+        return url, response.content, None
+    except Exception:
+        return url, None, traceback.format_exc()
+
+
+def write_file(path, content):
+    """Writes file atomically (readers never see partial content)"""
+    dir_path = os.path.dirname(path)
+    if not os.path.exists(dir_path):
+        os.makedirs(dir_path)
+    temp_path = '{0}.tmp'.format(path)
+    with open(temp_path, 'wb') as f:
+        f.write(content)
+    os.rename(temp_path, path)
+
+
+class WebsiteRenderOperation(BaseSyncOperation):
+    """RENDERS website Pages TO static HTML files"""
+
+    def __init__(self, processes=None, **options):
+        options.setdefault('no_interactive', True)
+        options.setdefault('git_add', False)
+        super(WebsiteRenderOperation, self).__init__(**options)
+        self.processes = processes or multiprocessing.cpu_count()
+        self.directory = app_settings.RENDER_DIRECTORY
+
+    def manifest_path(self):
+        """Absolute path to manifest file"""
+        return os.path.join(self.directory, MANIFEST_FILE_NAME)
+
+    def absolute_path(self, url):
+        """Absolute path to rendered file"""
+        return os.path.join(self.directory, url_to_file_path(url))
+
+    def load_manifest(self):
+        """
+        Manifest of previous run, mapping: URL -> version of rendered Page
+        """
+        try:
+            with codecs.open(self.manifest_path(), encoding='utf-8') as f:
+                return json.load(f)
+        except (IOError, ValueError):
+            return {}
+
+    def save_manifest(self, manifest):
+        """Saves manifest of current run"""
+        write_file(
+            self.manifest_path(),
+            json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8')
+        )
+
+    def page_versions(self):
+        """
+        Mapping: URL -> version of renderable Page.
+        Version changes with `changed_at` of the Page or any of its ancestors
+        (their templates are inherited) and with the chain of ancestors.
+        """
+        pages = Page.objects.filter(
+            url__startswith=self.root_url
+        ).order_by('pk').only(
+            'pk', 'url', 'page_processor', 'sitemap_included', 'changed_at'
+        )
+        all_pages = dict(
+            (url, (pk, changed_at))
+            for pk, url, changed_at in Page.objects.order_by(
+                '-pk'  # the first Page with given URL wins
+            ).values_list('pk', 'url', 'changed_at')
+        )
+        versions = collections.OrderedDict()
+        for page in pages:
+            if page.url in versions or not is_renderable(page):
+                continue
+            chain = [(page.pk, page.changed_at)]
+            url = get_parent_url(page.url)
+            while url in all_pages:
+                chain.append(all_pages[url])
+                url = get_parent_url(url)
+            versions[page.url] = ','.join(
+                '{0}:{1}'.format(pk, changed_at.isoformat())
+                for pk, changed_at in chain
+            )
+        return versions
+
+    def render_pages(self, urls):
+        """Renders Pages using pool of worker processes"""
+        if self.processes == 1 or len(urls) < 2:
+            for url in urls:
+                yield render_page(url)
+            return
+        connections.close_all()  # not to be shared with worker processes
+        pool = multiprocessing.Pool(self.processes)
+        try:
+            for result in pool.imap_unordered(render_page, urls, 8):
+                yield result
+        finally:
+            pool.close()
+            pool.join()
+
+    def render_changed_pages(self, versions, manifest, summary):
+        """Renders new and changed Pages, updates the manifest"""
+        statuses = collections.OrderedDict()
+        for url, version in versions.items():
+            if url not in manifest:
+                status = SyncStatus.ADDED
+            elif manifest[url] != version:
+                status = SyncStatus.MODIFIED
+            elif not os.path.exists(self.absolute_path(url)):
+                status = SyncStatus.ADDED
+            elif self.force:
+                status = SyncStatus.MODIFIED + SyncStatus.FORCED
+            else:
+                status = SyncStatus.NO_CHANGES
+            if status == SyncStatus.NO_CHANGES or self.dry_run:
+                self.log_status(status, url)
+                summary[status] += 1
+            else:
+                statuses[url] = status
+        for url, content, error in self.render_pages(list(statuses)):
+            status = statuses[url]
+            if content is None:
+                status += SyncStatus.SKIPPED
+                manifest.pop(url, None)
+                self.log_status(status, url)
+                self.stderr.write('{0}\n'.format(error.rstrip()))
+            else:
+                write_file(self.absolute_path(url), content)
+                manifest[url] = versions[url]
+                self.log_status(status, url)
+            summary[status] += 1
+
+    def delete_unused_files(self, versions, manifest, summary):
+        """Deletes files of Pages which are not rendered anymore"""
+        for url in sorted(manifest):
+            if url in versions or not url.startswith(self.root_url):
+                continue
+            status = SyncStatus.DELETED
+            self.log_status(status, url)
+            if not self.dry_run:
+                path = self.absolute_path(url)
+                if os.path.exists(path):
+                    os.remove(path)
+                del manifest[url]
+            summary[status] += 1
+
+    def run(self):
+        """Performs the operation"""
+        if not self.directory:
+            self.error('RENDER_DIRECTORY is not configured!')
+        summary = collections.defaultdict(int)
+        manifest = self.load_manifest()
+        versions = self.page_versions()
+        self.render_changed_pages(versions, manifest, summary)
+        self.delete_unused_files(versions, manifest, summary)
+        if not self.dry_run:
+            self.save_manifest(manifest)
+        self.summary(summary)
@@ -1,39 +1,172 @@
 # -*- coding: utf-8 -*-
 
+"""
+Reversing of Page aliases and Django URL names.
+Results are cached in two tiers: process-local LRU cache in front of
+the shared cache. Keys of both tiers contain current value of
+the Pages generation counter (bumped on every Page save / delete),
+so URLs of changed Pages are never served from any of them.
+"""
+
 from __future__ import unicode_literals
 
+import contextlib
+import threading
+
 from django.core.cache import cache
-from django.core.urlresolvers import reverse
+from django.core.urlresolvers import reverse, NoReverseMatch
 
-from powerpages.cachekeys import url_cache
+from powerpages.cachekeys import url_cache, PAGES_GENERATION
 from powerpages.models import Page
+from powerpages.settings import app_settings
+from powerpages.utils.generation import get_generation
+from powerpages.utils.lru_cache import LRUCache
 
 
-def reverse_url(name, *args, **kwargs):
+local_urls = LRUCache(lambda: app_settings.URL_CACHE_SIZE)
+
+_thread_locals = threading.local()
+
+
+@contextlib.contextmanager
+def pinned_generation(generation=None):
+    """
+    Reads Pages generation counter once (unless it's given) and uses it
+    for all URLs reversed in current thread inside the block (eg. rendering
+    of a Page), so the shared cache is not asked for it by every reversed
+    URL.
     """
-    Looks for entry matching given name and optional parameters in cache
-    and if it's not present tries to find CMS Page with given name,
-    then tries to reverse given name with params to static URL.
-    Updates the cache if result has been found and returns URL
-    or throws exception.
+    previous = (
+        getattr(_thread_locals, 'generation', None),
+        getattr(_thread_locals, 'generation_used', False)
+    )
+    if generation is None:
+        generation = get_generation(PAGES_GENERATION)
+    _thread_locals.generation = generation
+    _thread_locals.generation_used = False
+    try:
+        yield
+    finally:
+        _thread_locals.generation, _thread_locals.generation_used = previous
+
+
+def is_generation_pinned():
+    """Checks if current thread is inside `pinned_generation` block"""
+    return getattr(_thread_locals, 'generation', None) is not None
+
+
+def used_generation():
     """
-    # try to get url from cache
-    url_key = url_cache(name, *args, **kwargs)
-    url = cache.get(url_key, None)
+    Pinned Pages generation if any URL has been reversed using it
+    inside current `pinned_generation` block, None otherwise.
+    """
+    if getattr(_thread_locals, 'generation_used', False):
+        return _thread_locals.generation
+    return None
+
+
+def current_generation():
+    """Pinned Pages generation counter or its current value"""
+    generation = getattr(_thread_locals, 'generation', None)
+    if generation is None:
+        generation = get_generation(PAGES_GENERATION)
+    else:
+        _thread_locals.generation_used = True
+    return generation
 
-    # try to find CMS Page only if optional params are omitted
-    if not url and not args and not kwargs:
+
+def url_key(generation, name, args, kwargs):
+    """Cache key of URL valid for given Pages generation"""
+    return '{0}:{1}'.format(url_cache(name, *args, **kwargs), generation)
+
+
+def find_url(name, args, kwargs):
+    """
+    Tries to find CMS Page with given name (only if optional params
+    are omitted), then tries to reverse given name with params
+    to static URL. Throws exception if URL has not been found.
+    """
+    if not args and not kwargs:
         try:
-            page = Page.objects.get(alias=name)
-            url = page.url
+            return Page.objects.get(alias=name).url
         except Page.DoesNotExist:
             pass
+    # reverse will throw exception if it fails
+    return reverse(name, args=args, kwargs=kwargs)
 
-    # try to reverse url by the given name with arguments
-    if not url:
-        # reverse will throw exception if it fails
-        url = reverse(name, args=args, kwargs=kwargs)
-
-    cache.set(url_key, url)
 
+def reverse_url(name, *args, **kwargs):
+    """
+    Looks for entry matching given name and optional parameters
+    in process-local and shared cache, if it's not present tries
+    to find CMS Page with given name, then tries to reverse given name
+    with params to static URL.
+    Caches are updated only if URL has been missing in them.
+    Returns URL or throws exception.
+    """
+    generation = current_generation()
+    key = url_key(generation, name, args, kwargs)
+    # without generation counter (eg. DummyCache) local entries
+    # could never be invalidated
+    if generation is not None:
+        url = local_urls.get(key)
+        if url is not None:
+            return url
+    url = cache.get(key)
+    if url is None:
+        url = find_url(name, args, kwargs)
+        cache.set(key, url, app_settings.CACHE_SECONDS)
+    if generation is not None:
+        local_urls.set(key, url)
     return url
+
+
+def reverse_urls(lookups):
+    """
+    Batch version of `reverse_url` for list of (name, args, kwargs).
+    URLs missing in process-local cache are read using single `get_many`,
+    Pages for the remaining aliases are found by single query.
+    Returns pair: (list of URLs - None if URL can't be reversed,
+    generation the URLs are valid for).
+    """
+    generation = current_generation()
+    keys = [
+        url_key(generation, name, args, kwargs)
+        for name, args, kwargs in lookups
+    ]
+    urls = dict.fromkeys(keys)
+    if generation is not None:
+        for key in keys:
+            urls[key] = local_urls.get(key)
+    missing_keys = [key for key in keys if urls[key] is None]
+    if missing_keys:
+        cached_urls = cache.get_many(missing_keys)
+        urls.update(cached_urls)
+        missing = dict(
+            (key, lookup) for key, lookup in zip(keys, lookups)
+            if urls[key] is None
+        )
+        aliases = set(
+            name for name, args, kwargs in missing.values()
+            if not args and not kwargs
+        )
+        page_urls = dict(
+            Page.objects.filter(alias__in=aliases).values_list('alias', 'url')
+        ) if aliases else {}
+        found_urls = {}
+        for key, (name, args, kwargs) in missing.items():
+            if not args and not kwargs and name in page_urls:
+                found_urls[key] = page_urls[name]
+            else:
+                try:
+                    found_urls[key] = reverse(name, args=args, kwargs=kwargs)
+                except NoReverseMatch:
+                    pass
+        if found_urls:
+            cache.set_many(found_urls, app_settings.CACHE_SECONDS)
+        urls.update(found_urls)
+        if generation is not None:
+            for key in missing_keys:
+                if urls[key] is not None:
+                    local_urls.set(key, urls[key])
+    return [urls[key] for key in keys], generation
@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import collections
+import contextlib
+import threading
+
+from powerpages.models import Page, get_parent_url
+from powerpages.redirects import collapse_redirects
+from powerpages.utils.generation import get_generation
+from powerpages import page_processor_registry
+from powerpages import cachekeys
+
+try:  # Django < 1.10
+    from django.db.models.query_utils import deferred_class_factory
+except ImportError:
+    deferred_class_factory = None
+
+
+PageRoute = collections.namedtuple(
+    'PageRoute',
+    (
+        'pk', 'url', 'alias', 'page_processor', 'page_processor_config',
+        'changed_at'
+    )
+)
+
+
+def page_from_route(route):
+    """
+    Creates Page instance using data stored in the route.
+    Remaining fields are deferred - loaded from database on first access.
+    """
+    field_names = ('id',) + PageRoute._fields[1:]
+    model = Page
+    if deferred_class_factory is not None:
+        model = deferred_class_factory(Page, [
+            field.attname for field in Page._meta.concrete_fields
+            if field.attname not in field_names
+        ])
+    return model.from_db(Page.objects.db, field_names, route)
+
+
+def route_from_page(page):
+    """Creates PageRoute using (possibly unsaved) Page instance"""
+    return PageRoute(page.pk, *(
+        getattr(page, field_name) for field_name in PageRoute._fields[1:]
+    ))
+
+
+class PageRoutingTable(object):
+    """
+    Process-local mapping: URL -> PageRoute.
+    Allows to find Page matching requested URL without database queries.
+    Target locations of redirect Pages are resolved in advance.
+    Table is built lazily and rebuilt when generation counter
+    stored in the shared cache changes (on every Page save / delete).
+    """
+
+    def __init__(self):
+        self.generation = None
+        self.routes = {}
+        self.redirects = {}
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    def build(self):
+        """Creates mapping from all Pages using single query"""
+        routes = {}
+        rows = Page.objects.order_by('pk').values_list(
+            'pk', *PageRoute._fields[1:]
+        )
+        for row in rows:
+            route = PageRoute(*row)
+            routes.setdefault(route.url, route)  # first Page wins
+        return routes
+
+    def build_redirects(self, routes, default_response_only=False):
+        """
+        Creates mapping: URL -> (location, permanent) for redirect Pages
+        (having page processor providing `get_redirect` method).
+        `default_response_only` - skips Pages which processors customize
+        creation of the response or which target location depends
+        on the request (they have to be processed normally).
+        """
+        alias_urls = {}
+        for route in sorted(
+            routes.values(), key=lambda route: (route.pk is None, route.pk)
+        ):
+            if route.alias:
+                alias_urls.setdefault(route.alias, route.url)
+        redirects = {}
+        for route in routes.values():
+            try:
+                processor_class = page_processor_registry.get(
+                    route.page_processor
+                )
+            except page_processor_registry.registry.NotRegistered:
+                continue
+            if not hasattr(processor_class, 'get_redirect'):
+                continue
+            has_default_response = getattr(
+                processor_class, 'has_default_response', None
+            )
+            if default_response_only and not (
+                has_default_response and has_default_response()
+            ):
+                continue
+            page_processor = page_from_route(route).get_page_processor()
+            if default_response_only and \
+                    not page_processor.has_static_location():
+                continue
+            redirects[route.url] = page_processor.get_redirect(alias_urls)
+        return redirects
+
+    def build_redirects_with_page(self, page):
+        """
+        Creates mapping of redirects (not collapsed) as it would be
+        after saving given Page instance.
+        """
+        routes = dict(
+            (url, route) for url, route in self.build().items()
+            if page.pk is None or route.pk != page.pk
+        )
+        routes[page.url] = route_from_page(page)
+        return self.build_redirects(routes)
+
+    @contextlib.contextmanager
+    def pinned(self):
+        """
+        Refreshes the table only once (on the first lookup) for all lookups
+        inside the block in current thread (eg. processing of single
+        request), the shared generation counter is not read again.
+        """
+        previous_pinned = getattr(self.local, 'pinned', None)
+        self.local.pinned = {}
+        try:
+            yield
+        finally:
+            self.local.pinned = previous_pinned
+
+    def refresh(self):
+        """
+        Rebuilds the table if it's outdated (only once inside `pinned`
+        block). Returns False if shared generation counter is not available
+        (table can not be used).
+        """
+        pinned = getattr(self.local, 'pinned', None)
+        if pinned:
+            return pinned['available']
+        available = self.refresh_generation()
+        if pinned is not None:
+            pinned['available'] = available
+        return available
+
+    def refresh_generation(self):
+        """Rebuilds the table if shared generation counter has changed"""
+        generation = get_generation(cachekeys.PAGES_GENERATION)
+        if generation is None:
+            return False
+        if generation != self.generation:
+            with self.lock:
+                if generation != self.generation:
+                    routes = self.build()
+                    self.redirects = collapse_redirects(
+                        self.build_redirects(
+                            routes, default_response_only=True
+                        )
+                    )
+                    self.routes = routes
+                    self.generation = generation
+        return True
+
+    def get_generation(self):
+        """
+        Pages generation the table is valid for
+        or None if the table can not be used.
+        """
+        if not self.refresh():
+            return None
+        return self.generation
+
+    def get_route(self, url):
+        """
+        Retrieves PageRoute for given URL or None.
+        Always None if the table can not be used.
+        """
+        if not self.refresh():
+            return None
+        return self.routes.get(url)
+
+    def get_ancestor_routes(self, url):
+        """
+        Retrieves routes of parent, grandparent, etc. of the Page with given
+        URL (the same chain as followed by Page.parent()).
+        Returns None if the table can not be used.
+        """
+        if not self.refresh():
+            return None
+        routes = []
+        url = get_parent_url(url)
+        while url in self.routes:
+            routes.append(self.routes[url])
+            url = get_parent_url(url)
+        return routes
+
+    def get_redirect(self, url):
+        """
+        Retrieves pair (location, permanent) if Page with given URL
+        is a redirect or None.
+        Always None if the table can not be used.
+        """
+        if not self.refresh():
+            return None
+        return self.redirects.get(url)
+
+    def get_page(self, url):
+        """
+        Retrieves Page for given URL or None.
+        Falls back to database query if the table can not be used.
+        """
+        if not self.refresh():
+            return Page.objects.filter(url=url).first()
+        route = self.routes.get(url)
+        if route is None:
+            return None
+        return page_from_route(route)
+
+
+routing_table = PageRoutingTable()
@@ -8,12 +8,22 @@ from django.test.signals import setting_changed
 
 DEFAULTS = {
     'CACHE_SECONDS': 60 * 60,  # 1 hour
+    'CACHE_LOCK_SECONDS': 30,  # max. time of single page regeneration
+    'TEMPLATE_CACHE_SIZE': 1000,  # compiled templates per process
+    'URL_CACHE_SIZE': 10000,  # reversed URLs per process
+    'CONFIG_CACHE_SIZE': 10000,  # parsed page processor configs per process
+    'SERVER_TIMING': False,  # Server-Timing header for staff users
     'SYNC_DIRECTORY': None,
+    'RENDER_DIRECTORY': None,
     'TAG_LIBRARIES': (),
     'SITEMAP_PROTOCOL': None,
     'SITEMAP_DOMAIN': None,
     'SITEMAP_DEFAULT_CHANGEFREQ': None,
     'SITEMAP_DEFAULT_PRIORITY': None,
+    'SITEMAP_STREAMING': False,  # stream sitemap.xml instead of caching it
+    'SITEMAP_INDEX': False,  # sitemap.xml as index of sitemap shards
+    'SITEMAP_SHARD_SIZE': 50000,  # max. number of URLs in single shard
+    'SITEMAP_DIRECTORY': None,  # pre-generated sitemap files
 }
 
 
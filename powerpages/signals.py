@@ -6,3 +6,16 @@ from django.dispatch import Signal
 
 
 page_edited = Signal(providing_args=['page', 'user', 'created'])
+
+# Sent after each context processor from page processor config is executed,
+# only if any receiver is connected:
+context_processor_executed = Signal(
+    providing_args=['page', 'request', 'context_processor', 'duration']
+)
+
+# Sent after Page request is processed, with durations of its phases,
+# only if any receiver is connected or `SERVER_TIMING` setting is enabled
+# (`page` is None for redirects answered by the routing table):
+page_timed = Signal(
+    providing_args=['page', 'request', 'response', 'timings']
+)
@@ -2,58 +2,41 @@
 
 from __future__ import unicode_literals
 
-import datetime
-
-from django.utils import six
-
 from powerpages import sitemap_config
 from powerpages.models import Page
 
 
-VALID_CHANGEFREQ = (
-    '', 'always', 'hourly', 'daily', 'weekly', 'monthly', 'yearly', 'never',
-)
-
-
-class PageSitemap(sitemap_config.Sitemap):
-    """Sitemap configuration for powerpages.Page model"""
-
-    def get_items(self):
-        for page in Page.objects.all():
-            if not page.is_accessible():
-                continue  # No sitemap for inaccessible Pages
-            page_processor = page.get_page_processor()
-            sitemap_settings = page_processor.config.get('sitemap')
-            conf_item = {}
-            if isinstance(sitemap_settings, dict):
-                if 'lastmod' in sitemap_settings:
-                    try:
-                        lastmod = datetime.datetime.strptime(
-                            six.text_type(sitemap_settings['lastmod']),
-                            '%Y-%m-%d'
-                        )
-                    except ValueError:
-                        pass
-                    else:
-                        conf_item['lastmod'] = lastmod
-                if 'priority' in sitemap_settings:
-                    try:
-                        priority = float(sitemap_settings['priority'])
-                    except (ValueError, TypeError):
-                        pass
-                    else:
-                        conf_item['priority'] = priority
-                if 'changefreq' in sitemap_settings:
-                    changefreq = sitemap_settings['changefreq']
-                    if changefreq in VALID_CHANGEFREQ:
-                        conf_item['changefreq'] = changefreq
-            if sitemap_settings is not None and not sitemap_settings:
-                # sitemap settings defined, but false in boolean context
-                continue
-            conf_item['location'] = page.url
-            if 'lastmod' not in conf_item:
-                conf_item['lastmod'] = page.changed_at
-            yield conf_item
+class PageSitemap(sitemap_config.ModelSitemap):
+    """
+    Sitemap configuration for powerpages.Page model.
+    Uses sitemap settings denormalized on save (see `get_sitemap_fields`),
+    entries are stored and updated when Pages are saved / deleted.
+    """
+
+    queryset = Page.objects.filter(sitemap_included=True)
+    incremental = True
+
+    def get_source_queryset(self):
+        return self.queryset.only(
+            'pk', 'url', 'changed_at', 'sitemap_lastmod', 'sitemap_priority',
+            'sitemap_changefreq'
+        )
+
+    def get_entry(self, page):
+        if not page.sitemap_included:
+            return None
+        return self.from_instance(page)
+
+    def from_instance(self, page):
+        conf_item = {
+            'location': page.url,
+            'lastmod': page.sitemap_lastmod or page.changed_at,
+        }
+        if page.sitemap_priority is not None:
+            conf_item['priority'] = page.sitemap_priority
+        if page.sitemap_changefreq is not None:
+            conf_item['changefreq'] = page.sitemap_changefreq
+        return conf_item
 
 
 sitemap_config.sitemaps.add(PageSitemap)
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+
+"""
+Rendering and cache of sitemap.xml.
+Content depends on the request (protocol and host are used to build
+absolute URLs), so it's cached separately for each of them.
+Keys contain Pages and sitemap entries generation counters, so the sitemap
+is rendered again after any Page (or entry of incremental sitemap)
+has been changed.
+Alternatively (`SITEMAP_STREAMING` setting) sitemap is streamed
+in chunks, without holding the whole document in memory.
+With `SITEMAP_INDEX` setting, sitemap.xml is an index of shards
+(up to `SITEMAP_SHARD_SIZE` URLs each) of all registered sitemaps,
+every shard is rendered and cached on its own.
+"""
+
+from __future__ import unicode_literals
+
+import itertools
+
+from django.core.cache import cache
+from django.core.urlresolvers import reverse, NoReverseMatch
+from django.template.loader import render_to_string
+
+from powerpages.settings import app_settings
+from powerpages.utils.generation import get_generations
+from powerpages import sitemap_config
+from powerpages import cachekeys
+
+
+URLSET_START = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+)
+URLSET_END = '</urlset>\n'
+CHUNK_SIZE = 500  # number of URLs rendered at once by stream_urls
+
+
+def get_cache_key(request, shard=''):
+    """Cache key of sitemap (or its shard) content for given request"""
+    generations = get_generations(
+        [cachekeys.PAGES_GENERATION, cachekeys.SITEMAP_GENERATION]
+    )
+    return cachekeys.sitemap_content(
+        'https' if request.is_secure() else 'http',
+        request.get_host(),
+        '{0}.{1}'.format(
+            generations[cachekeys.PAGES_GENERATION],
+            generations[cachekeys.SITEMAP_GENERATION]
+        ),
+        shard
+    )
+
+
+def count_shards(sitemap):
+    """Number of shards of given sitemap (at least one, even empty)"""
+    shard_size = app_settings.SITEMAP_SHARD_SIZE
+    return max(1, (sitemap.count_items() + shard_size - 1) // shard_size)
+
+
+def get_shard_sitemap(request, section, number):
+    """
+    Sitemap instance for given section if shard with given number exists,
+    otherwise None.
+    """
+    sitemap_class = sitemap_config.sitemaps.sections().get(section)
+    if sitemap_class is None or number < 1:
+        return None
+    sitemap = sitemap_class(request=request)
+    if number > 1 and number > count_shards(sitemap):
+        return None
+    return sitemap
+
+
+def get_shard_urls(sitemap, number):
+    """Generator over URLs of shard with given number"""
+    shard_size = app_settings.SITEMAP_SHARD_SIZE
+    return sitemap.get_urls((number - 1) * shard_size, number * shard_size)
+
+
+def render_urls(request, urls):
+    """Renders sitemap.xml with given URLs"""
+    return render_to_string(
+        'powerpages/sitemap.xml', context={'urlset': urls}, request=request
+    )
+
+
+def stream_urls(urls):
+    """
+    Generator over parts of sitemap.xml with given URLs,
+    rendered in chunks of `CHUNK_SIZE` URLs.
+    """
+    yield URLSET_START
+    urls = iter(urls)
+    while True:
+        chunk = list(itertools.islice(urls, CHUNK_SIZE))
+        if not chunk:
+            break
+        yield render_to_string(
+            'powerpages/sitemap_urls.xml', context={'urlset': chunk}
+        )
+    yield URLSET_END
+
+
+def render_sitemap(request):
+    """Renders sitemap.xml with URLs of all registered sitemaps"""
+    return render_urls(request, sitemap_config.sitemaps.urls(request))
+
+
+def stream_sitemap(request):
+    """Generator over parts of sitemap.xml with URLs of all sitemaps"""
+    return stream_urls(sitemap_config.sitemaps.urls(request))
+
+
+def reverse_shard_url(request, section, number):
+    """
+    Path of the shard of the sitemap, app's URLs may be included
+    with or without namespace.
+    """
+    kwargs = {'section': section, 'number': number}
+    names = ['sitemap_shard', 'powerpages:sitemap_shard']
+    resolver_match = getattr(request, 'resolver_match', None)
+    if resolver_match and resolver_match.namespace:
+        names.insert(0, '{0}:sitemap_shard'.format(resolver_match.namespace))
+    for name in names[:-1]:
+        try:
+            return reverse(name, kwargs=kwargs)
+        except NoReverseMatch:
+            pass
+    return reverse(names[-1], kwargs=kwargs)
+
+
+def render_index(request):
+    """Renders sitemap index pointing at shards of all registered sitemaps"""
+    locations = []
+    for section, sitemap_class in sitemap_config.sitemaps.sections().items():
+        sitemap = sitemap_class(request=request)
+        for number in range(1, count_shards(sitemap) + 1):
+            locations.append('{0}://{1}{2}'.format(
+                sitemap.protocol, sitemap.domain,
+                reverse_shard_url(request, section, number)
+            ))
+    return render_to_string(
+        'powerpages/sitemap_index.xml',
+        context={'locations': locations}, request=request
+    )
+
+
+def render_shard(request, section, number):
+    """Renders shard of the sitemap, returns None if it doesn't exist"""
+    sitemap = get_shard_sitemap(request, section, number)
+    if sitemap is None:
+        return None
+    return render_urls(request, get_shard_urls(sitemap, number))
+
+
+def stream_shard(request, section, number):
+    """
+    Generator over parts of the shard of the sitemap,
+    returns None if the shard doesn't exist.
+    """
+    sitemap = get_shard_sitemap(request, section, number)
+    if sitemap is None:
+        return None
+    return stream_urls(get_shard_urls(sitemap, number))
+
+
+def cache_content(request, shard, content):
+    """Stores content of sitemap (or its shard) in the cache"""
+    if content is not None:
+        cache.set(
+            get_cache_key(request, shard), content, app_settings.CACHE_SECONDS
+        )
+    return content
+
+
+def rebuild_sitemap(request):
+    """
+    Renders sitemap.xml (and all shards when sitemap index is enabled)
+    and stores it in the cache.
+    """
+    if not app_settings.SITEMAP_INDEX:
+        return cache_content(request, '', render_sitemap(request))
+    for section, sitemap_class in sitemap_config.sitemaps.sections().items():
+        sitemap = sitemap_class(request=request)
+        for number in range(1, count_shards(sitemap) + 1):
+            cache_content(
+                request, '{0}-{1}'.format(section, number),
+                render_urls(request, get_shard_urls(sitemap, number))
+            )
+    return cache_content(request, '', render_index(request))
+
+
+def get_sitemap(request):
+    """
+    Retrieves sitemap.xml (or sitemap index) from the cache,
+    renders it if missing.
+    """
+    content = cache.get(get_cache_key(request))
+    if content is None:
+        if app_settings.SITEMAP_INDEX:
+            content = render_index(request)
+        else:
+            content = render_sitemap(request)
+        cache_content(request, '', content)
+    return content
+
+
+def get_shard(request, section, number):
+    """
+    Retrieves shard of the sitemap from the cache, renders it if missing.
+    Returns None if the shard doesn't exist.
+    """
+    shard = '{0}-{1}'.format(section, number)
+    content = cache.get(get_cache_key(request, shard))
+    if content is None:
+        content = cache_content(
+            request, shard, render_shard(request, section, number)
+        )
+    return content
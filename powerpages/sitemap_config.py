@@ -2,11 +2,56 @@
 
 from __future__ import unicode_literals
 
+import collections
+import datetime
+import itertools
+
+from django.core.exceptions import ImproperlyConfigured
 from django.core.urlresolvers import reverse
+from django.utils import six
 
 from powerpages.settings import app_settings
 
 
+VALID_CHANGEFREQ = (
+    '', 'always', 'hourly', 'daily', 'weekly', 'monthly', 'yearly', 'never',
+)
+
+
+def parse_sitemap_settings(sitemap_settings):
+    """
+    Converts `sitemap` option of page processor config into dictionary
+    with valid values of `lastmod` (date), `priority` and `changefreq`.
+    Returns None if sitemap settings are defined, but false in boolean
+    context (no sitemap for the Page).
+    """
+    if sitemap_settings is not None and not sitemap_settings:
+        return None
+    conf_item = {}
+    if isinstance(sitemap_settings, dict):
+        if 'lastmod' in sitemap_settings:
+            try:
+                lastmod = datetime.datetime.strptime(
+                    six.text_type(sitemap_settings['lastmod']), '%Y-%m-%d'
+                )
+            except ValueError:
+                pass
+            else:
+                conf_item['lastmod'] = lastmod.date()
+        if 'priority' in sitemap_settings:
+            try:
+                priority = float(sitemap_settings['priority'])
+            except (ValueError, TypeError):
+                pass
+            else:
+                conf_item['priority'] = priority
+        if 'changefreq' in sitemap_settings:
+            changefreq = sitemap_settings['changefreq']
+            if changefreq in VALID_CHANGEFREQ:
+                conf_item['changefreq'] = changefreq
+    return conf_item
+
+
 class NamedURL(object):
     """Wrapper over named URLs to provide lazy reversion"""
 
@@ -27,10 +72,15 @@ class Sitemap(object):
     domain = None
     changefreq = None
     priority = None
+    # name used in URLs of sitemap index shards, by default: lowercase
+    # class name without "Sitemap" suffix:
+    section = None
 
     class URL(object):
         """Single sitemap URL"""
 
+        __slots__ = ('location', 'lastmod', 'changefreq', 'priority')
+
         def __init__(self, location, lastmod=None, changefreq=None,
                      priority=None):
             self.location = location
@@ -58,13 +108,38 @@ class Sitemap(object):
         if self.priority is None:
             self.priority = app_settings.SITEMAP_DEFAULT_PRIORITY
 
+    @classmethod
+    def get_section(cls):
+        """Name of the sitemap in sitemap index"""
+        if cls.section:
+            return cls.section
+        name = cls.__name__
+        if name.endswith('Sitemap') and name != 'Sitemap':
+            name = name[:-len('Sitemap')]
+        return name.lower()
+
     def get_items(self):
         """To be overriden when dynamic items needed"""
         return getattr(self, 'items', ())
 
-    def get_urls(self):
-        """Generator over all URL instances provided by this sitemap."""
-        for conf_item in self.get_items():
+    def get_items_slice(self, start, stop):
+        """Items from given range, may be overriden to fetch less data"""
+        return itertools.islice(self.get_items(), start, stop)
+
+    def count_items(self):
+        """Number of items, may be overriden by faster implementation"""
+        return sum(1 for conf_item in self.get_items())
+
+    def get_urls(self, start=None, stop=None):
+        """
+        Generator over all URL instances provided by this sitemap
+        (or URLs from given range of items).
+        """
+        if start is None and stop is None:
+            conf_items = self.get_items()
+        else:
+            conf_items = self.get_items_slice(start, stop)
+        for conf_item in conf_items:
             url_kwargs = conf_item.copy()
             raw_location = url_kwargs.pop('location')
             if hasattr(raw_location, 'reverse_url'):
@@ -85,12 +160,68 @@ class ModelSitemap(Sitemap):
     Single sitemap configuration class with items based on model
     instances from given queryset.
     Subclasses have to contain `queryset` attribute.
+    Incremental sitemaps (`incremental = True`) read items from
+    SitemapEntry table, updated when model instances are saved / deleted
+    (see `powerpages.sitemap_entries`).
     """
 
+    incremental = False
+
+    def get_source_queryset(self):
+        """Queryset of model instances visible in the sitemap"""
+        return self.queryset.all()  # working on queryset copy
+
     def get_items(self):
-        for obj in self.queryset.all():  # working on queryset copy
+        if self.incremental:
+            from powerpages import sitemap_entries
+            return sitemap_entries.get_stored_items(self.get_section())
+        return self.get_source_items()
+
+    def get_source_items(self):
+        """Generator over items based on model instances"""
+        # not caching all instances:
+        for obj in self.get_source_queryset().iterator():
+            yield self.from_instance(obj)
+
+    def get_items_slice(self, start, stop):
+        if self.incremental:
+            from powerpages import sitemap_entries
+            return sitemap_entries.get_stored_items(
+                self.get_section(), start, stop
+            )
+        return self.get_source_items_slice(start, stop)
+
+    def get_source_items_slice(self, start, stop):
+        """Generator over items based on model instances from given range"""
+        queryset = self.get_source_queryset()
+        if not queryset.ordered:  # stable order of shards
+            queryset = queryset.order_by('pk')
+        for obj in queryset[start:stop].iterator():
             yield self.from_instance(obj)
 
+    def count_items(self):
+        if self.incremental:
+            from powerpages import sitemap_entries
+            return sitemap_entries.count_stored_items(self.get_section())
+        return self.get_source_queryset().count()
+
+    def get_source_entries(self):
+        """
+        Generator over pairs (object key, item) of all model instances,
+        used to rebuild entries of incremental sitemap.
+        """
+        for obj in self.get_source_queryset().iterator():
+            yield six.text_type(obj.pk), self.from_instance(obj)
+
+    def get_entry(self, obj):
+        """
+        Item of incremental sitemap for given (saved) model instance
+        or None if the instance is not visible in the sitemap.
+        """
+        if not self.get_source_queryset().filter(pk=obj.pk).exists():
+            return None
+        return self.from_instance(obj)
+
     def get_instance_location(self, obj):
         """Retrieves URL of particular model instance."""
         return obj.get_absolute_url()
@@ -109,8 +240,37 @@ class URLSet(object):
         self.sitemaps = set()
 
     def add(self, sitemap):
+        if getattr(sitemap, 'incremental', False) and \
+                sitemap not in self.sitemaps:
+            from powerpages import sitemap_entries
+            sitemap_entries.connect(sitemap)
         self.sitemaps.add(sitemap)
 
+    def incremental_sitemaps(self):
+        """Registered sitemap classes storing their entries"""
+        return [
+            sitemap_class for sitemap_class in self.sections().values()
+            if getattr(sitemap_class, 'incremental', False)
+        ]
+
+    def sections(self):
+        """Ordered mapping: section name -> sitemap class"""
+        sections = collections.OrderedDict()
+        for sitemap_class in sorted(
+            self.sitemaps, key=lambda sitemap: sitemap.get_section()
+        ):
+            section = sitemap_class.get_section()
+            if section in sections:
+                raise ImproperlyConfigured(
+                    'Sitemaps {0} and {1} have the same section "{2}", '
+                    'use "section" attribute to rename one of them.'.format(
+                        sections[section].__name__, sitemap_class.__name__,
+                        section
+                    )
+                )
+            sections[section] = sitemap_class
+        return sections
+
     def urls(self, request=None):
         """Generator over all URL instances provided by all sitemaps."""
         for sitemap_class in self.sitemaps:
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+
+"""
+Incremental sitemaps (`ModelSitemap.incremental = True`):
+URLs are stored in SitemapEntry table, single entry is updated
+by post_save / post_delete receivers when its source object changes,
+so generation of the sitemap doesn't depend on number of source objects.
+Full rebuild (`website_sitemap --rebuild-entries`) repairs entries
+after changes not sending signals (eg. `QuerySet.update`).
+"""
+
+from __future__ import unicode_literals
+
+import datetime
+import itertools
+
+from django.db import models, transaction
+from django.utils import six, timezone
+
+from powerpages.models import SitemapEntry
+from powerpages.utils.generation import bump_generation
+from powerpages import cachekeys
+
+
+def to_date(value):
+    """Date of `lastmod` given as date or datetime"""
+    if isinstance(value, datetime.datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        return value.date()
+    return value
+
+
+def get_object_key(obj):
+    """Identifier of source object of the entry"""
+    return six.text_type(obj.pk)
+
+
+def get_entry_fields(conf_item):
+    """Values of SitemapEntry fields for given sitemap item"""
+    location = conf_item['location']
+    if hasattr(location, 'reverse_url'):
+        location = location.reverse_url()
+    return {
+        'location': location,
+        'lastmod': to_date(conf_item.get('lastmod')),
+        'changefreq': conf_item.get('changefreq'),
+        'priority': conf_item.get('priority'),
+    }
+
+
+def get_stored_entries(section):
+    """Rows of stored entries of given sitemap section"""
+    return SitemapEntry.objects.filter(section=section).order_by(
+        'pk'
+    ).values_list('location', 'lastmod', 'changefreq', 'priority')
+
+
+def from_row(row):
+    """Converts single row of stored entries into sitemap item"""
+    location, lastmod, changefreq, priority = row
+    conf_item = {'location': location}
+    if lastmod is not None:
+        conf_item['lastmod'] = lastmod
+    if changefreq is not None:
+        conf_item['changefreq'] = changefreq
+    if priority is not None:
+        conf_item['priority'] = priority
+    return conf_item
+
+
+def get_stored_items(section, start=None, stop=None):
+    """Generator over sitemap items stored for given section"""
+    rows = get_stored_entries(section)
+    if start is not None or stop is not None:
+        rows = rows[start:stop]
+    for row in rows.iterator():
+        yield from_row(row)
+
+
+def count_stored_items(section):
+    """Number of entries stored for given section"""
+    return SitemapEntry.objects.filter(section=section).count()
+
+
+def update_entry(sitemap_class, obj):
+    """Updates (or removes) stored entry of given source object"""
+    section = sitemap_class.get_section()
+    object_key = get_object_key(obj)
+    conf_item = sitemap_class().get_entry(obj)
+    if conf_item is None:
+        SitemapEntry.objects.filter(
+            section=section, object_key=object_key
+        ).delete()
+    else:
+        SitemapEntry.objects.update_or_create(
+            section=section, object_key=object_key,
+            defaults=get_entry_fields(conf_item)
+        )
+    bump_generation(cachekeys.SITEMAP_GENERATION)
+
+
+def delete_entry(sitemap_class, obj):
+    """Removes stored entry of deleted source object"""
+    SitemapEntry.objects.filter(
+        section=sitemap_class.get_section(), object_key=get_object_key(obj)
+    ).delete()
+    bump_generation(cachekeys.SITEMAP_GENERATION)
+
+
+def rebuild_entries(sitemap_class, chunk_size=500):
+    """
+    Replaces all entries stored for given sitemap with entries
+    generated from source objects. Returns number of entries.
+    Entries are written in chunks, so they are never all kept in memory.
+    """
+    section = sitemap_class.get_section()
+    entries = (
+        SitemapEntry(
+            section=section, object_key=object_key,
+            **get_entry_fields(conf_item)
+        )
+        for object_key, conf_item in sitemap_class().get_source_entries()
+    )
+    count = 0
+    with transaction.atomic():
+        SitemapEntry.objects.filter(section=section).delete()
+        while True:
+            chunk = list(itertools.islice(entries, chunk_size))
+            if not chunk:
+                break
+            SitemapEntry.objects.bulk_create(chunk)
+            count += len(chunk)
+    bump_generation(cachekeys.SITEMAP_GENERATION)
+    return count
+
+
+def get_dispatch_uid(sitemap_class):
+    """Identifier of receivers connected for given sitemap"""
+    return 'powerpages.sitemap_entries.{0}'.format(sitemap_class.get_section())
+
+
+def connect(sitemap_class):
+    """Connects receivers updating entries of given incremental sitemap"""
+    dispatch_uid = get_dispatch_uid(sitemap_class)
+
+    def source_saved(sender, instance, **kwargs):
+        update_entry(sitemap_class, instance)
+
+    def source_deleted(sender, instance, **kwargs):
+        delete_entry(sitemap_class, instance)
+
+    model = sitemap_class.queryset.model
+    models.signals.post_save.connect(
+        source_saved, sender=model, weak=False, dispatch_uid=dispatch_uid
+    )
+    models.signals.post_delete.connect(
+        source_deleted, sender=model, weak=False, dispatch_uid=dispatch_uid
+    )
+
+
+def disconnect(sitemap_class):
+    """Disconnects receivers connected for given incremental sitemap"""
+    dispatch_uid = get_dispatch_uid(sitemap_class)
+    model = sitemap_class.queryset.model
+    models.signals.post_save.disconnect(
+        sender=model, dispatch_uid=dispatch_uid
+    )
+    models.signals.post_delete.disconnect(
+        sender=model, dispatch_uid=dispatch_uid
+    )
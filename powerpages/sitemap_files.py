@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+
+"""
+Pre-generated sitemap files (`website_sitemap --write` command),
+written together with gzipped versions to `SITEMAP_DIRECTORY`,
+separately for each protocol and host (`<directory>/<scheme>/<host>/`).
+When present, they are served instead of generating the sitemap
+on the request path.
+"""
+
+from __future__ import unicode_literals
+
+import os
+import re
+import gzip
+
+from django import http
+from django.utils.cache import patch_vary_headers
+
+from powerpages.settings import app_settings
+from powerpages.utils.http import accepts_encoding
+from powerpages import sitemap_cache
+from powerpages import sitemap_config
+
+
+SITEMAP_FILE_NAME = 'sitemap.xml'
+SHARD_FILE_NAME_RE = re.compile(r'^sitemap-[\w-]+-\d+\.xml$')
+
+
+def shard_file_name(section, number):
+    """Name of the file with shard of the sitemap"""
+    return 'sitemap-{0}-{1}.xml'.format(section, number)
+
+
+def get_host_directory(request, directory):
+    """Directory with sitemap files for protocol and host of the request"""
+    return os.path.join(directory, request.scheme, request.get_host().lower())
+
+
+def iter_documents(request):
+    """
+    Generator over pairs (file name, iterable over parts of content)
+    of all sitemap documents, shards precede sitemap index.
+    """
+    if not app_settings.SITEMAP_INDEX:
+        yield SITEMAP_FILE_NAME, sitemap_cache.stream_sitemap(request)
+        return
+    for section, sitemap_class in sitemap_config.sitemaps.sections().items():
+        sitemap = sitemap_class(request=request)
+        for number in range(1, sitemap_cache.count_shards(sitemap) + 1):
+            yield shard_file_name(section, number), sitemap_cache.stream_urls(
+                sitemap_cache.get_shard_urls(sitemap, number)
+            )
+    yield SITEMAP_FILE_NAME, [sitemap_cache.render_index(request)]
+
+
+def write_document(directory, file_name, parts):
+    """
+    Writes content given as parts to the file and its gzipped version
+    atomically (readers never see partial content).
+    """
+    path = os.path.join(directory, file_name)
+    temp_path = '{0}.tmp'.format(path)
+    temp_gzip_path = '{0}.gz.tmp'.format(path)
+    with open(temp_path, 'wb') as f:
+        with gzip.GzipFile(temp_gzip_path, 'wb') as gzip_file:
+            for part in parts:
+                data = part.encode('utf-8')
+                f.write(data)
+                gzip_file.write(data)
+    os.rename(temp_gzip_path, '{0}.gz'.format(path))
+    os.rename(temp_path, path)
+
+
+def write_sitemaps(request, directory):
+    """
+    Writes all sitemap documents for protocol and host of the request
+    to given directory, removes files of shards which no longer exist.
+    Returns list of written file names.
+    """
+    directory = get_host_directory(request, directory)
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+    file_names = []
+    for file_name, parts in iter_documents(request):
+        write_document(directory, file_name, parts)
+        file_names.append(file_name)
+    for file_name in os.listdir(directory):
+        base_name = file_name[:-3] if file_name.endswith('.gz') else file_name
+        if SHARD_FILE_NAME_RE.match(base_name) and \
+                base_name not in file_names:
+            os.remove(os.path.join(directory, file_name))
+    return file_names
+
+
+def file_response(request, file_name):
+    """
+    Response with pre-generated sitemap file for protocol and host of the
+    request (gzipped version if client accepts it) or None if the file
+    doesn't exist.
+    """
+    if not app_settings.SITEMAP_DIRECTORY:
+        return None
+    directory = get_host_directory(request, app_settings.SITEMAP_DIRECTORY)
+    path = os.path.join(directory, file_name)
+    gzip_path = '{0}.gz'.format(path)
+    if accepts_encoding(request, 'gzip') and os.path.exists(gzip_path):
+        response = http.FileResponse(
+            open(gzip_path, 'rb'), content_type='application/xml'
+        )
+        response['Content-Encoding'] = 'gzip'
+    elif os.path.exists(path):
+        response = http.FileResponse(
+            open(path, 'rb'), content_type='application/xml'
+        )
+    else:
+        return None
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
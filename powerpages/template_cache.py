@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+
+"""
+Process-local cache of compiled Page templates.
+Parsing template source is skipped as long as the source is unchanged.
+"""
+
+from __future__ import unicode_literals
+
+from django.template import Template
+from django.utils import six
+
+from powerpages.utils.lru_cache import LRUCache
+from powerpages.settings import app_settings
+
+
+compiled_templates = LRUCache(lambda: app_settings.TEMPLATE_CACHE_SIZE)
+
+
+def get_template(page_pk, source, origin=None, name=None, engine=None):
+    """
+    Retrieves compiled Template of the Page with given source.
+    Template is compiled (and cached) only if it's missing.
+    """
+    key = (six.text_type(page_pk), name, source)
+    template = compiled_templates.get(key)
+    if template is None:
+        template = Template(source, origin, name, engine)
+        compiled_templates.set(key, template)
+    return template
+
+
+def evict(page_pk):
+    """Removes all compiled templates of given Page"""
+    page_pk = six.text_type(page_pk)
+    compiled_templates.delete_matching(lambda key: key[0] == page_pk)
+
+
+def stats():
+    """Hit / miss counters and size of the cache"""
+    return compiled_templates.stats()
@@ -4,10 +4,15 @@ from __future__ import unicode_literals
 
 from django import template
 from django.core.urlresolvers import reverse, NoReverseMatch
-from django.template.base import kwarg_re
+from django.template.base import kwarg_re, Variable
+from django.template.loader_tags import ExtendsNode
 from django.utils.encoding import smart_str
+from django.utils import six
 
-from powerpages.reverse import reverse_url
+from powerpages.reverse import (
+    reverse_url, reverse_urls, current_generation, is_generation_pinned
+)
+from powerpages.routing import routing_table
 
 
 register = template.Library()
@@ -56,29 +61,79 @@ def page_url_compiler(node_class):
                 else:
                     args.append(parser.compile_filter(arg_value))
 
-        return node_class(name, args, kwargs, as_var)
+        node = node_class(name, args, kwargs, as_var)
+        # rendered Pages resolve their URLs in batch (prefetch_constant_urls)
+        if node.constant and not is_generation_pinned():
+            try:
+                node.get_constant_url()
+            except NoReverseMatch:
+                pass  # URL may become available later, eg. as a new Page
+        return node
 
     return _page_url_parser
 
 
+def is_literal(filter_expression):
+    """Checks if template expression is a literal without filters"""
+    var = filter_expression.var
+    return not filter_expression.filters and (
+        not isinstance(var, Variable) or var.lookups is None
+    )
+
+
 class PageURLNode(template.Node):
     """
     Template tag for inserting URL leading to CMS Page or static URL.
     """
 
+    # pair: (Pages generation, URL) for tags with literal arguments:
+    constant_url = None
+
     def __init__(self, name, args, kwargs, as_var):
         self.name = name
         self.args = args
         self.kwargs = kwargs
         self.as_var = as_var
+        self.constant = self.is_constant()
 
-    def render(self, context):
+    def is_constant(self):
+        """Checks if all arguments of the tag are literals"""
+        return all(
+            is_literal(value)
+            for value in list(self.args) + list(self.kwargs.values())
+        )
+
+    def resolve_arguments(self, context):
+        """Resolves arguments in given context"""
         args = [arg.resolve(context) for arg in self.args]
         kwargs = dict([(smart_str(k, 'ascii'), v.resolve(context))
                        for k, v in self.kwargs.items()])
+        return args, kwargs
+
+    def resolve_url(self, context):
+        """Resolves arguments in given context and generates URL"""
+        args, kwargs = self.resolve_arguments(context)
+        return self.get_url(self.name, *args, **kwargs)
 
-        name = self.name
-        url = self.get_url(name, *args, **kwargs)
+    def get_constant_url(self):
+        """
+        URL of the tag with literal arguments, generated again
+        only if any Page has changed since the last time.
+        """
+        generation = current_generation()
+        constant_url = self.constant_url
+        if constant_url is not None and constant_url[0] == generation:
+            return constant_url[1]
+        url = self.resolve_url(template.Context())
+        if generation is not None:
+            self.constant_url = (generation, url)
+        return url
+
+    def render(self, context):
+        if self.constant:
+            url = self.get_constant_url()
+        else:
+            url = self.resolve_url(context)
 
         if self.as_var:
             context[self.as_var] = url
@@ -96,6 +151,97 @@ page_url = register.tag(
 )
 
 
+def get_parent_page_template(compiled_template):
+    """
+    Compiled template of parent Page extended by given template
+    or None if template doesn't extend other Page.
+    Memoized on the compiled template until any Page changes.
+    """
+    generation = routing_table.get_generation()
+    memoized = getattr(compiled_template, '_powerpages_parent_template', None)
+    if memoized is not None and generation is not None and \
+            memoized[0] == generation:
+        return memoized[1]
+    parent_template = find_parent_page_template(compiled_template)
+    if generation is not None:
+        compiled_template._powerpages_parent_template = (
+            generation, parent_template
+        )
+    return parent_template
+
+
+def find_parent_page_template(compiled_template):
+    """Looks up compiled template of parent Page using template loaders"""
+    for node in compiled_template.nodelist:
+        if isinstance(node, ExtendsNode):
+            if not is_literal(node.parent_name):
+                return None
+            parent_name = node.parent_name.resolve(template.Context())
+            if not isinstance(parent_name, six.string_types) or \
+                    not parent_name.startswith('page/'):
+                return None
+            try:
+                return compiled_template.engine.get_template(parent_name)
+            except template.TemplateDoesNotExist:
+                return None
+    return None
+
+
+def get_constant_url_nodes(compiled_template):
+    """
+    page_url tags with literal arguments in given template (not including
+    its parent Pages), memoized on the compiled template object.
+    """
+    try:
+        return compiled_template._powerpages_constant_url_nodes
+    except AttributeError:
+        pass
+    nodes = [
+        node for node in
+        compiled_template.nodelist.get_nodes_by_type(PageURLNode)
+        # custom get_url may generate URL differently:
+        if node.constant and six.get_unbound_function(
+            type(node).get_url
+        ) is six.get_unbound_function(PageURLNode.get_url)
+    ]
+    compiled_template._powerpages_constant_url_nodes = nodes
+    return nodes
+
+
+def prefetch_constant_urls(compiled_template):
+    """
+    Resolves URLs of all outdated page_url tags with literal arguments
+    in given template and templates of its parent Pages as a single batch,
+    so they aren't looked up one by one during rendering.
+    """
+    nodes = []
+    seen_templates = set()
+    while compiled_template is not None and \
+            id(compiled_template) not in seen_templates:
+        seen_templates.add(id(compiled_template))
+        nodes.extend(get_constant_url_nodes(compiled_template))
+        compiled_template = get_parent_page_template(compiled_template)
+    if not nodes:
+        return
+    generation = current_generation()
+    outdated_nodes = [
+        node for node in nodes
+        if node.constant_url is None or node.constant_url[0] != generation
+    ]
+    if not outdated_nodes:
+        return
+    lookups = []
+    for node in outdated_nodes:
+        args, kwargs = node.resolve_arguments(template.Context())
+        lookups.append((node.name, args, kwargs))
+    urls, generation = reverse_urls(lookups)
+    if generation is None:
+        return
+    for node, url in zip(outdated_nodes, urls):
+        if url is not None:
+            node.constant_url = (generation, url)
+
+
 @register.inclusion_tag(
     'powerpages/current_page_info.html', takes_context=True
 )
@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+from django.conf.urls import include, url
+
+
+urlpatterns = [
+    url(r'', include('powerpages.urls', namespace='powerpages')),
+]
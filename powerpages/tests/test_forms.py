@@ -77,7 +77,7 @@ class PageFormTestCase(TestCase):
             'keywords': 'lorem ipsum dolor sit amet',
             'page_processor': 'powerpages.RedirectProcessor',
             'page_processor_config': yaml.dump({
-                'to url': '/test/'
+                'to url': '/new-test/'
             }),
             'template': '<h1>{{ website_page.title }}</h1>\n',
             'title': 'De Finibus Bonorum et Malorum'
@@ -93,7 +93,7 @@ class PageFormTestCase(TestCase):
                 'keywords': 'lorem ipsum dolor sit amet',
                 'page_processor': 'powerpages.RedirectProcessor',
                 'page_processor_config': {
-                    'to url': '/test/'
+                    'to url': '/new-test/'
                 },
                 'template': '<h1>{{ website_page.title }}</h1>\n',
                 'title': 'De Finibus Bonorum et Malorum'
@@ -108,7 +108,7 @@ class PageFormTestCase(TestCase):
             'keywords': '   lorem ipsum dolor sit amet',
             'page_processor': 'powerpages.RedirectProcessor',
             'page_processor_config': yaml.dump({
-                'to url': '/test/'
+                'to url': '/new-test/'
             }),
             'template': '\n\t<h1>{{ website_page.title }}</h1>\n   \n\n\r\n',
             'title': '  De Finibus Bonorum et Malorum  \t'
@@ -124,7 +124,7 @@ class PageFormTestCase(TestCase):
                 'keywords': 'lorem ipsum dolor sit amet',
                 'page_processor': 'powerpages.RedirectProcessor',
                 'page_processor_config': {
-                    'to url': '/test/'
+                    'to url': '/new-test/'
                 },
                 'template': '<h1>{{ website_page.title }}</h1>\n',
                 'title': 'De Finibus Bonorum et Malorum'
@@ -213,3 +213,89 @@ class PageFormTestCase(TestCase):
         form = PageAdminForm(data, instance=Page())
         self.assertFalse(form.is_valid())
         self.assertEqual(list(form.errors.keys()), ['page_processor_config'])
+
+    def test_invalid_form_data_unknown_context_processor(self):
+        data = {
+            'url': '/test/',
+            'alias': 'test-page',
+            'description': 'At vero eos et accusamus et iusto odio',
+            'keywords': 'lorem ipsum dolor sit amet',
+            'page_processor': 'powerpages.DefaultPageProcessor',
+            'page_processor_config': yaml.dump({
+                'context processors': ['powerpages.tests.utils.missing']
+            }),
+            'template': '<h1>{{ website_page.title }}</h1>\n',
+            'title': 'De Finibus Bonorum et Malorum'
+        }
+        form = PageAdminForm(data, instance=Page())
+        self.assertFalse(form.is_valid())
+        self.assertEqual(list(form.errors.keys()), ['__all__'])
+        self.assertIn(
+            'context processors: Unable to import '
+            '"powerpages.tests.utils.missing"',
+            form.errors['__all__'][0]
+        )
+
+    def test_invalid_form_data_context_processor_not_string(self):
+        for context_processors in ([123], [['powerpages.tests.utils']]):
+            data = {
+                'url': '/test/',
+                'alias': 'test-page',
+                'description': '',
+                'keywords': '',
+                'page_processor': 'powerpages.DefaultPageProcessor',
+                'page_processor_config': yaml.dump({
+                    'context processors': context_processors
+                }),
+                'template': '<h1>{{ website_page.title }}</h1>\n',
+                'title': 'De Finibus Bonorum et Malorum'
+            }
+            form = PageAdminForm(data, instance=Page())
+            self.assertFalse(form.is_valid())
+            self.assertIn(
+                'is not a dotted path to a callable',
+                form.errors['__all__'][0]
+            )
+
+    def test_invalid_form_data_redirect_loop(self):
+        Page.objects.create(
+            url='/new-test/',
+            page_processor='powerpages.RedirectProcessor',
+            page_processor_config={'to alias': 'test-page'}
+        )
+        data = {
+            'url': '/test/',
+            'alias': 'test-page',
+            'description': '',
+            'keywords': '',
+            'page_processor': 'powerpages.RedirectProcessor',
+            'page_processor_config': yaml.dump({
+                'to url': '/new-test/'
+            }),
+            'template': '',
+            'title': ''
+        }
+        form = PageAdminForm(data, instance=Page())
+        self.assertFalse(form.is_valid())
+        self.assertEqual(list(form.errors.keys()), ['__all__'])
+        self.assertEqual(
+            form.errors['__all__'],
+            ['Redirect loop detected: /test/ -> /new-test/ -> /test/']
+        )
+
+    def test_invalid_form_data_redirect_to_itself(self):
+        data = {
+            'url': '/test/',
+            'alias': '',
+            'description': '',
+            'keywords': '',
+            'page_processor': 'powerpages.RedirectProcessor',
+            'page_processor_config': yaml.dump({
+                'to url': '/test/'
+            }),
+            'template': '',
+            'title': ''
+        }
+        form = PageAdminForm(data, instance=Page())
+        self.assertFalse(form.is_valid())
+        self.assertEqual(list(form.errors.keys()), ['__all__'])
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+from django.test import TestCase
+from django.core.cache import cache
+from django.template import TemplateDoesNotExist
+
+from powerpages.models import Page
+from powerpages.loader import (
+    WebsiteLoader, fetch_template_sources, primed_pages
+)
+from powerpages import cachekeys
+
+
+class WebsiteLoaderTestCase(TestCase):
+
+    maxDiff = None
+
+    def setUp(self):
+        cache.clear()
+
+    def test_load_template_source(self):
+        page = Page.objects.create(url='/', template='<h1>Root</h1>\n')
+        loader = WebsiteLoader(engine=None)
+        source, display_name = loader.load_template_source(
+            'page/{0}'.format(page.pk)
+        )
+        self.assertEqual(source, '{% load powerpages_tags %}<h1>Root</h1>\n')
+        self.assertEqual(display_name, 'page:{0}'.format(page.pk))
+        self.assertEqual(cache.get(cachekeys.template_source(page.pk)), source)
+
+    def test_load_template_source_missing(self):
+        loader = WebsiteLoader(engine=None)
+        with self.assertRaises(TemplateDoesNotExist):
+            loader.load_template_source('page/1')
+        with self.assertRaises(TemplateDoesNotExist):
+            loader.load_template_source('other/template.html')
+
+    def test_fetch_template_sources(self):
+        root = Page.objects.create(url='/', template='<h1>Root</h1>\n')
+        child = Page.objects.create(url='/a/', template='<h1>A</h1>\n')
+        cache.set(cachekeys.template_source(root.pk), 'CACHED')
+        cache.delete(cachekeys.template_source(child.pk))
+        sources = fetch_template_sources([root, child])
+        child_source = (
+            '{{% extends "page/{0}" %}}'
+            '{{% load powerpages_tags %}}<h1>A</h1>\n'.format(root.pk)
+        )
+        self.assertEqual(
+            sources,
+            {
+                '{0}'.format(root.pk): 'CACHED',
+                '{0}'.format(child.pk): child_source,
+            }
+        )
+        self.assertEqual(
+            cache.get(cachekeys.template_source(child.pk)), child_source
+        )
+
+    def test_primed_pages(self):
+        page = Page.objects.create(url='/', template='<h1>Root</h1>\n')
+        loader = WebsiteLoader(engine=None)
+        with primed_pages([page]):
+            cache.clear()
+            with self.assertNumQueries(0):
+                source, display_name = loader.load_template_source(
+                    'page/{0}'.format(page.pk)
+                )
+        self.assertEqual(source, '{% load powerpages_tags %}<h1>Root</h1>\n')
+        self.assertIsNone(cache.get(cachekeys.template_source(page.pk)))
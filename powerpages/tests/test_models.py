@@ -2,6 +2,8 @@
 
 from __future__ import unicode_literals
 
+import datetime
+
 from django.utils import six
 from django.test import TestCase
 from django.core.urlresolvers import reverse
@@ -81,6 +83,35 @@ class PageModelTestCase(TestCase):
         )
         self.assertIsNone(page.parent())
 
+    # def ancestors(self):
+
+    def test_ancestors(self):
+        root = Page.objects.create(url='/')
+        child = Page.objects.create(url='/a/')
+        grandchild = Page.objects.create(url='/a/b/')
+        Page.objects.create(url='/x/')
+        page = Page.objects.create(url='/a/b/c/')
+        with self.assertNumQueries(1):
+            ancestors = page.ancestors()
+            self.assertEqual(ancestors, [grandchild, child, root])
+            # parent() results are cached:
+            self.assertEqual(page.parent(), grandchild)
+            self.assertEqual(ancestors[0].parent(), child)
+            self.assertEqual(ancestors[1].parent(), root)
+            self.assertIsNone(ancestors[2].parent())
+
+    def test_ancestors_missing_parent(self):
+        Page.objects.create(url='/')
+        Page.objects.create(url='/a/')
+        page = Page.objects.create(url='/a/b/c/')
+        self.assertEqual(page.ancestors(), [])  # /a/b/ does not exist
+        self.assertIsNone(page.parent())
+
+    def test_ancestors_of_root(self):
+        page = Page.objects.create(url='/')
+        with self.assertNumQueries(0):
+            self.assertEqual(page.ancestors(), [])
+
     # def children(self):
 
     def test_children_empty(self):
@@ -171,3 +202,88 @@ class PageModelTestCase(TestCase):
             page.get_admin_url(),
             reverse('admin:powerpages_page_change', args=[page.pk])
         )
+
+    # page_processor_config:
+
+    def test_page_processor_config_decoded_on_access(self):
+        Page.objects.create(url='/test/', page_processor_config={'cache': 15})
+        page = Page.objects.get(url='/test/')
+        self.assertIsInstance(
+            page.__dict__['page_processor_config'], six.text_type
+        )
+        self.assertEqual(page.page_processor_config, {'cache': 15})
+        self.assertEqual(page.__dict__['page_processor_config'], {'cache': 15})
+        self.assertEqual(page.get_page_processor_config(), {'cache': 15})
+
+    def test_page_processor_config_not_decoded_saved(self):
+        Page.objects.create(url='/test/', page_processor_config={'cache': 15})
+        page = Page.objects.get(url='/test/')
+        page.title = 'Test'
+        page.save()
+        self.assertIsInstance(
+            page.__dict__['page_processor_config'], six.text_type
+        )
+        self.assertEqual(
+            Page.objects.get(url='/test/').page_processor_config,
+            {'cache': 15}
+        )
+
+    def test_page_processor_config_deferred(self):
+        Page.objects.create(url='/test/', page_processor_config={'cache': 15})
+        page = Page.objects.only('url').get(url='/test/')
+        with self.assertNumQueries(1):
+            self.assertEqual(page.page_processor_config, {'cache': 15})
+
+    # sitemap fields:
+
+    def test_sitemap_fields_default(self):
+        page = Page.objects.create(url='/test/')
+        page = Page.objects.get(pk=page.pk)
+        self.assertTrue(page.sitemap_included)
+        self.assertIsNone(page.sitemap_lastmod)
+        self.assertIsNone(page.sitemap_priority)
+        self.assertIsNone(page.sitemap_changefreq)
+
+    def test_sitemap_fields_from_config(self):
+        page = Page.objects.create(
+            url='/test/',
+            page_processor_config={
+                'sitemap': {
+                    'lastmod': '2017-01-24', 'priority': '0.8',
+                    'changefreq': 'daily'
+                }
+            }
+        )
+        page = Page.objects.get(pk=page.pk)
+        self.assertTrue(page.sitemap_included)
+        self.assertEqual(page.sitemap_lastmod, datetime.date(2017, 1, 24))
+        self.assertEqual(page.sitemap_priority, 0.8)
+        self.assertEqual(page.sitemap_changefreq, 'daily')
+
+    def test_sitemap_fields_invalid_values_ignored(self):
+        page = Page.objects.create(
+            url='/test/',
+            page_processor_config={
+                'sitemap': {
+                    'lastmod': 'yesterday', 'priority': 'high',
+                    'changefreq': 'sometimes'
+                }
+            }
+        )
+        page = Page.objects.get(pk=page.pk)
+        self.assertTrue(page.sitemap_included)
+        self.assertIsNone(page.sitemap_lastmod)
+        self.assertIsNone(page.sitemap_priority)
+        self.assertIsNone(page.sitemap_changefreq)
+
+    def test_sitemap_fields_excluded(self):
+        page = Page.objects.create(url='/test/')
+        page.page_processor_config = {'sitemap': False}
+        page.save(update_fields=['page_processor_config'])
+        self.assertFalse(Page.objects.get(pk=page.pk).sitemap_included)
+
+    def test_sitemap_fields_not_accessible(self):
+        page = Page.objects.create(
+            url='/test/', page_processor='powerpages.NotFoundProcessor'
+        )
+        self.assertFalse(Page.objects.get(pk=page.pk).sitemap_included)
@@ -2,18 +2,50 @@
 
 from __future__ import unicode_literals
 
-from django.test import TestCase
+import datetime
+
+from django.test import TestCase, TransactionTestCase
+from django.db import transaction
 from django.test.utils import override_settings
 from django.core.cache import cache
+from django.utils.http import http_date
 
 from powerpages.models import Page
+from powerpages.page_processors import RedirectProcessor
+from powerpages import page_processor_registry
+from powerpages.signals import context_processor_executed
+from powerpages.utils.http import datetime_to_timestamp
 from powerpages import cachekeys
+from powerpages.tests import utils as test_utils
+
+
+class CustomResponseRedirectProcessor(RedirectProcessor):
+
+    @staticmethod
+    def create_redirect_response(location, permanent):
+        response = RedirectProcessor.create_redirect_response(
+            location, permanent
+        )
+        response['X-Redirect'] = 'custom'
+        return response
+
+
+class LegacyAliasRedirectProcessor(RedirectProcessor):
+
+    def get_redirect_to_alias(self):
+        location = super(
+            LegacyAliasRedirectProcessor, self
+        ).get_redirect_to_alias()
+        return location and '{0}?legacy'.format(location)
 
 
 class PageViewTestCase(TestCase):
 
     maxDiff = None
 
+    def setUp(self):
+        cache.clear()
+
     # Default Processor:
 
     def test_page_view_ok(self):
@@ -70,6 +102,24 @@ class PageViewTestCase(TestCase):
         self.assertEqual(grandchild_response.status_code, 200)
         self.assertContains(grandchild_response, '<h1>GrandChild</h1>')
 
+    def test_page_view_template_inheritance_queries(self):
+        Page.objects.create(
+            url='/',
+            template="<h1>{% block header %}Root{% endblock %}</h1>"
+        )
+        for url in ('/a/', '/a/b/', '/a/b/c/', '/a/b/c/d/'):
+            Page.objects.create(
+                url=url,
+                template="{% block header %}{{ block.super }}!{% endblock %}"
+            )
+        self.client.get('/')  # builds routing table
+        for page in Page.objects.all():
+            cache.delete(cachekeys.template_source(page.pk))
+        # deferred fields of the page + all ancestors:
+        with self.assertNumQueries(2):
+            response = self.client.get('/a/b/c/d/')
+        self.assertContains(response, '<h1>Root!!!!</h1>')
+
     def test_page_view_ok_custom_base_template(self):
         root = Page.objects.create(
             url='/',
@@ -130,6 +180,35 @@ class PageViewTestCase(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, "<h1>Magic Number is 42!</h1>")
 
+    def test_page_view_context_processor_executed_signal(self):
+        Page.objects.create(
+            url='/',
+            template="<h1>Magic Number is {{ magic_number }}!</h1>",
+            page_processor_config={
+                'context processors': [
+                    'powerpages.tests.utils.context_processor'
+                ]
+            }
+        )
+        executed = []
+
+        def handler(sender, **kwargs):
+            executed.append(kwargs)
+
+        context_processor_executed.connect(handler)
+        try:
+            response = self.client.get('/')
+        finally:
+            context_processor_executed.disconnect(handler)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(executed), 1)
+        self.assertEqual(
+            executed[0]['context_processor'],
+            'powerpages.tests.utils.context_processor'
+        )
+        self.assertEqual(executed[0]['page'].url, '/')
+        self.assertGreaterEqual(executed[0]['duration'], 0)
+
     def test_page_view_ok_request_context_processor(self):
         Page.objects.create(
             url='/',
@@ -189,13 +268,307 @@ class PageViewTestCase(TestCase):
             template='<h1>Hello world!</h1>',
             page_processor_config={'cache': 15}  # cache for 15 seconds
         )
-        cache_key = cachekeys.rendered_source_for_lang(page.pk, 'en')
+        version = page.get_page_processor().get_cache_version()
+        cache_key = cachekeys.rendered_source_for_lang(page.pk, 'en', version)
         self.assertNotIn(cache_key, cache)
         response = self.client.get('/test/')
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, '<h1>Hello world!</h1>')
         self.assertIn(cache_key, cache)
 
+    @override_settings(
+        CACHES={
+            'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': 'powerpages-test'
+            }
+        }
+    )
+    def test_page_view_stale_content_served_during_regeneration(self):
+        page = Page.objects.create(
+            url='/test/',
+            template='<h1>Hello world!</h1>',
+            page_processor_config={'cache': 15, 'cache grace': 60}
+        )
+        version = page.get_page_processor().get_cache_version()
+        cache_key = cachekeys.rendered_source_for_lang(page.pk, 'en', version)
+        # expired:
+        cache.set(cache_key, ('<h1>Stale</h1>', 'stale', 0, None), 60)
+        # other worker is regenerating the content:
+        cache.set(cachekeys.regeneration_lock(cache_key), True, 30)
+        response = self.client.get('/test/')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '<h1>Stale</h1>')
+
+    @override_settings(
+        CACHES={
+            'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': 'powerpages-test'
+            }
+        }
+    )
+    def test_page_view_stale_content_regenerated(self):
+        page = Page.objects.create(
+            url='/test/',
+            template='<h1>Hello world!</h1>',
+            page_processor_config={'cache': 15, 'cache grace': 60}
+        )
+        version = page.get_page_processor().get_cache_version()
+        cache_key = cachekeys.rendered_source_for_lang(page.pk, 'en', version)
+        # expired:
+        cache.set(cache_key, ('<h1>Stale</h1>', 'stale', 0, None), 60)
+        response = self.client.get('/test/')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '<h1>Hello world!</h1>')
+        content, etag, expires_at, urls_generation = cache.get(cache_key)
+        self.assertEqual(content, '<h1>Hello world!</h1>')
+        self.assertNotIn(cachekeys.regeneration_lock(cache_key), cache)
+
+    @override_settings(
+        CACHES={
+            'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': 'powerpages-test'
+            }
+        }
+    )
+    def test_page_view_ok_with_cache_no_queries(self):
+        Page.objects.create(
+            url='/test/',
+            template='<h1>Hello world!</h1>',
+            page_processor_config={'cache': 15}  # cache for 15 seconds
+        )
+        self.client.get('/test/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/test/')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '<h1>Hello world!</h1>')
+
+    @override_settings(
+        CACHES={
+            'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': 'powerpages-test'
+            }
+        }
+    )
+    def test_page_view_with_cache_round_trips(self):
+        Page.objects.create(
+            url='/', template='<h1>{% block title %}{% endblock %}</h1>'
+        )
+        Page.objects.create(
+            url='/test/',
+            template='{% block title %}Hello world!{% endblock %}',
+            page_processor_config={'cache': 15}
+        )
+        with override_settings(CACHES=test_utils.COUNTING_CACHES):
+            self.client.get('/test/')
+            test_utils.CountingCache.counts.clear()
+            response = self.client.get('/test/')
+        self.assertContains(response, '<h1>Hello world!</h1>')
+        # Pages generation, cached content and versions of Pages:
+        self.assertEqual(
+            dict(test_utils.CountingCache.counts), {'get': 2, 'get_many': 1}
+        )
+
+    @override_settings(
+        CACHES={
+            'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': 'powerpages-test'
+            }
+        }
+    )
+    def test_page_view_with_cache_context_not_built(self):
+        Page.objects.create(
+            url='/test/',
+            template='<h1>Hello world!</h1>',
+            page_processor_config={
+                'cache': 15,
+                'context processors': [
+                    'powerpages.tests.utils.counting_context_processor'
+                ]
+            }
+        )
+        del test_utils.calls[:]
+        response1 = self.client.get('/test/')
+        response2 = self.client.get('/test/')
+        self.assertEqual(test_utils.calls, ['/test/'])
+        self.assertEqual(response1['ETag'], response2['ETag'])
+        self.assertContains(response2, '<h1>Hello world!</h1>')
+
+    def test_page_view_with_cache_parent_changed(self):
+        root = Page.objects.create(
+            url='/',
+            template='<h1>{% block header %}Root{% endblock %}</h1>'
+        )
+        Page.objects.create(
+            url='/a/',
+            template='{% block header %}Child{% endblock %}',
+            page_processor_config={'cache': 15}
+        )
+        response = self.client.get('/a/')
+        self.assertContains(response, '<h1>Child</h1>')
+        root.template = '<h2>{% block header %}Root{% endblock %}</h2>'
+        root.save()
+        response = self.client.get('/a/')
+        self.assertContains(response, '<h2>Child</h2>')
+
+    def test_page_view_with_cache_parent_added(self):
+        Page.objects.create(
+            url='/',
+            template='<h1>{% block header %}Root{% endblock %}</h1>'
+        )
+        Page.objects.create(
+            url='/a/b/',
+            template='{% block header %}Grand{% endblock %}',
+            page_processor_config={'cache': 15}
+        )
+        response = self.client.get('/a/b/')
+        self.assertEqual(response.content, b'Grand')  # no parent page
+        Page.objects.create(
+            url='/a/',
+            template='<h1>{% block header %}Child{% endblock %}</h1>'
+        )
+        response = self.client.get('/a/b/')
+        self.assertContains(response, '<h1>Grand</h1>')
+
+    def test_page_view_with_cache_page_url_changed(self):
+        Page.objects.create(
+            url='/test/',
+            template='<a href="{% page_url other %}">Other</a>',
+            page_processor_config={'cache': 15}
+        )
+        other = Page.objects.create(url='/other/', alias='other')
+        self.assertContains(self.client.get('/test/'), 'href="/other/"')
+        other.url = '/moved/'
+        other.save()
+        self.assertContains(self.client.get('/test/'), 'href="/moved/"')
+
+    def test_page_view_with_cache_other_page_changed(self):
+        Page.objects.create(
+            url='/test/',
+            template='<h1>Hello world!</h1>',
+            page_processor_config={
+                'cache': 15,
+                'context processors': [
+                    'powerpages.tests.utils.counting_context_processor'
+                ]
+            }
+        )
+        other = Page.objects.create(url='/other/')
+        del test_utils.calls[:]
+        self.client.get('/test/')
+        other.save()
+        self.client.get('/test/')
+        self.assertEqual(test_utils.calls, ['/test/'])  # not rendered again
+
+    # Conditional GET:
+
+    def test_page_view_etag(self):
+        Page.objects.create(
+            url='/test/',
+            template='<h1>Hello world!</h1>'
+        )
+        response = self.client.get('/test/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['ETag'])
+        self.assertFalse(response.has_header('Last-Modified'))
+        response = self.client.get(
+            '/test/', HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        response = self.client.get(
+            '/test/', HTTP_IF_NONE_MATCH='"other"'
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_page_view_if_modified_since_without_cache(self):
+        page = Page.objects.create(
+            url='/test/',
+            template='<h1>Hello world!</h1>'
+        )
+        response = self.client.get(
+            '/test/', HTTP_IF_MODIFIED_SINCE=http_date(
+                datetime_to_timestamp(page.changed_at) + 60
+            )
+        )
+        self.assertEqual(response.status_code, 200)  # content may change
+
+    def test_page_view_etag_page_changed(self):
+        Page.objects.create(url='/', template='<h1>Root</h1>')
+        Page.objects.create(url='/test/', template='<h1>Hello world!</h1>')
+        etag = self.client.get('/test/')['ETag']
+        root = Page.objects.get(url='/')
+        root.save()  # the same content, but new version of ancestor
+        response = self.client.get('/test/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_page_view_last_modified_with_cache(self):
+        page = Page.objects.create(
+            url='/test/',
+            template='<h1>Hello world!</h1>',
+            page_processor_config={'cache': 15}
+        )
+        response = self.client.get('/test/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response['Last-Modified'],
+            http_date(datetime_to_timestamp(page.changed_at))
+        )
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                '/test/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+            )
+        self.assertEqual(response.status_code, 304)
+
+    def test_page_view_last_modified_ancestor_changed(self):
+        Page.objects.create(url='/', template='<h1>Root</h1>')
+        page = Page.objects.create(
+            url='/test/',
+            page_processor_config={'cache': 15}
+        )
+        root = Page.objects.get(url='/')
+        root.changed_at = page.changed_at + datetime.timedelta(days=1)
+        Page.objects.filter(pk=root.pk).update(changed_at=root.changed_at)
+        root.save(update_fields=['template'])  # invalidates routing table
+        response = self.client.get('/test/')
+        self.assertEqual(
+            response['Last-Modified'],
+            http_date(datetime_to_timestamp(root.changed_at))
+        )
+
+    def test_page_view_head_not_rendered(self):
+        Page.objects.create(
+            url='/test/',
+            template='{% page_url missing-page %}',  # fails on render
+            page_processor_config={'cache': 15}
+        )
+        response = self.client.head('/test/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'')
+        self.assertTrue(response['ETag'].startswith('W/"'))
+        self.assertTrue(response['Last-Modified'])
+        response = self.client.head(
+            '/test/', HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_page_view_head_without_cache(self):
+        Page.objects.create(
+            url='/test/',
+            template='<h1>Hello world!</h1>'
+        )
+        etag = self.client.get('/test/')['ETag']
+        response = self.client.head('/test/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+        self.assertFalse(response.has_header('Last-Modified'))
+
     # Not Found Processor:
 
     def test_page_view_not_found(self):
@@ -246,6 +619,18 @@ class PageViewTestCase(TestCase):
         self.assertEqual(response.status_code, 301)
         self.assertEqual(response['Location'], '/new/')
 
+    def test_page_view_redirect_to_name(self):
+        Page.objects.create(
+            url='/old/',
+            page_processor='powerpages.RedirectProcessor',
+            page_processor_config={'to name': 'switch_edit_mode'}
+        )
+        response = self.client.get('/old/')
+        self.assertEqual(response.status_code, 301)
+        self.assertEqual(
+            response['Location'], '/powerpages-admin/switch-edit-mode/'
+        )
+
     def test_page_view_redirect_302(self):
         Page.objects.create(
             url='/old/',
@@ -259,3 +644,71 @@ class PageViewTestCase(TestCase):
         response = self.client.get('/old/')
         self.assertEqual(response.status_code, 302)
         self.assertEqual(response['Location'], '/new/')
+
+    def test_page_view_redirect_no_queries(self):
+        Page.objects.create(
+            url='/old/',
+            page_processor='powerpages.RedirectProcessor',
+            page_processor_config={'to alias': 'new_page'}
+        )
+        Page.objects.create(
+            url='/new/',
+            alias='new_page'
+        )
+        self.client.get('/old/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/old/')
+        self.assertEqual(response.status_code, 301)
+        self.assertEqual(response['Location'], '/new/')
+
+    def test_page_view_redirect_custom_response(self):
+        page_processor_registry.register(CustomResponseRedirectProcessor)
+        self.addCleanup(
+            page_processor_registry.unregister,
+            CustomResponseRedirectProcessor
+        )
+        Page.objects.create(
+            url='/old/',
+            page_processor='tests.CustomResponseRedirectProcessor',
+            page_processor_config={'to url': '/new/'}
+        )
+        response = self.client.get('/old/')
+        self.assertEqual(response.status_code, 301)
+        self.assertEqual(response['Location'], '/new/')
+        self.assertEqual(response['X-Redirect'], 'custom')
+
+    def test_page_view_redirect_legacy_alias_hook(self):
+        page_processor_registry.register(LegacyAliasRedirectProcessor)
+        self.addCleanup(
+            page_processor_registry.unregister,
+            LegacyAliasRedirectProcessor
+        )
+        Page.objects.create(
+            url='/old/',
+            page_processor='tests.LegacyAliasRedirectProcessor',
+            page_processor_config={'to alias': 'new_page'}
+        )
+        Page.objects.create(
+            url='/new/',
+            alias='new_page'
+        )
+        response = self.client.get('/old/')
+        self.assertEqual(response.status_code, 301)
+        self.assertEqual(response['Location'], '/new/?legacy')
+
+
+class PageViewCommitTestCase(TransactionTestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_page_version_bumped_after_commit(self):
+        page = Page.objects.create(url='/test/', template='Old')
+        with transaction.atomic():
+            page.template = 'New'
+            page.save()
+            # other process renders old content with the new version:
+            version = page.get_page_processor().get_cache_version()
+        self.assertNotEqual(
+            page.get_page_processor().get_cache_version(), version
+        )
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+from django.test import TestCase
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.utils.six import StringIO
+
+from powerpages.models import Page
+from powerpages.redirects import (
+    follow_chain, collapse_redirects, find_chains, RedirectLoop
+)
+from powerpages.routing import PageRoutingTable
+
+
+class RedirectChainTestCase(TestCase):
+
+    redirects = {
+        '/a/': ('/b/', True),
+        '/b/': ('/c/', False),
+        '/c/': ('/final/', True),
+        '/x/': ('/y/', True),
+        '/y/': ('/x/', True),
+        '/single/': ('/final/', True),
+    }
+
+    def test_follow_chain(self):
+        self.assertEqual(
+            follow_chain('/a/', self.redirects),
+            (['/a/', '/b/', '/c/', '/final/'], False)
+        )
+        self.assertEqual(
+            follow_chain('/c/', self.redirects), (['/c/', '/final/'], True)
+        )
+
+    def test_follow_chain_loop(self):
+        with self.assertRaises(RedirectLoop) as cm:
+            follow_chain('/x/', self.redirects)
+        self.assertEqual(cm.exception.chain, ['/x/', '/y/', '/x/'])
+
+    def test_collapse_redirects(self):
+        self.assertEqual(
+            collapse_redirects(self.redirects),
+            {
+                '/a/': ('/final/', False),
+                '/b/': ('/final/', False),
+                '/c/': ('/final/', True),
+                '/x/': ('/y/', True),  # loop - not changed
+                '/y/': ('/x/', True),
+                '/single/': ('/final/', True),
+            }
+        )
+
+    def test_find_chains(self):
+        self.assertEqual(
+            list(find_chains(self.redirects)),
+            [
+                (['/a/', '/b/', '/c/', '/final/'], False),
+                (['/b/', '/c/', '/final/'], False),
+                (['/x/', '/y/', '/x/'], True),
+                (['/y/', '/x/', '/y/'], True),
+            ]
+        )
+
+
+class RedirectPagesTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        Page.objects.create(
+            url='/old/',
+            page_processor='powerpages.RedirectProcessor',
+            page_processor_config={'to url': '/older/'}
+        )
+        Page.objects.create(
+            url='/older/',
+            page_processor='powerpages.RedirectProcessor',
+            page_processor_config={'to alias': 'new-page'}
+        )
+        Page.objects.create(url='/new/', alias='new-page')
+
+    def test_chain_collapsed_in_routing_table(self):
+        routing_table = PageRoutingTable()
+        self.assertEqual(routing_table.get_redirect('/old/'), ('/new/', True))
+
+    def test_chain_served_as_single_hop(self):
+        response = self.client.get('/old/')
+        self.assertEqual(response.status_code, 301)
+        self.assertEqual(response['Location'], '/new/')
+
+    def test_command(self):
+        stdout = StringIO()
+        call_command('website_redirects', stdout=stdout)
+        self.assertEqual(
+            stdout.getvalue(),
+            'CHAIN: /old/ -> /older/ -> /new/\n'
+            'SUMMARY: 1 chain(s), 0 loop(s)\n'
+        )
+
+    def test_command_loop(self):
+        Page.objects.filter(url='/new/').update(
+            page_processor='powerpages.RedirectProcessor',
+            page_processor_config='to url: /old/\n'
+        )
+        stdout = StringIO()
+        with self.assertRaises(CommandError):
+            call_command('website_redirects', stdout=stdout)
+        self.assertIn(
+            'LOOP: /new/ -> /old/ -> /older/ -> /new/', stdout.getvalue()
+        )
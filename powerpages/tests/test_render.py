@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import os
+import json
+import shutil
+import tempfile
+
+from django.utils.six import StringIO
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.core.cache import cache
+from django.core.management import call_command
+
+from powerpages.models import Page
+from powerpages.render import (
+    WebsiteRenderOperation, url_to_file_path, MANIFEST_FILE_NAME
+)
+
+
+class UrlToFilePathTestCase(TestCase):
+
+    def test_root(self):
+        self.assertEqual(url_to_file_path('/'), 'index.html')
+
+    def test_nested(self):
+        self.assertEqual(url_to_file_path('/a/b/'), 'a/b/index.html')
+
+    def test_file_name(self):
+        self.assertEqual(url_to_file_path('/robots.txt'), 'robots.txt')
+
+
+class WebsiteRenderOperationTestCase(TestCase):
+
+    maxDiff = None
+
+    def setUp(self):
+        cache.clear()
+        self.render_directory = tempfile.mkdtemp()
+        self.settings_change = override_settings(
+            POWER_PAGES={'RENDER_DIRECTORY': self.render_directory}
+        )
+        self.settings_change.enable()
+        self.root = Page.objects.create(
+            url='/',
+            template='<h1>{% block content %}{% endblock %}</h1>'
+        )
+        self.child = Page.objects.create(
+            url='/a/',
+            template='{% block content %}Child{% endblock %}'
+        )
+
+    def tearDown(self):
+        self.settings_change.disable()
+        shutil.rmtree(self.render_directory)
+
+    def _run(self, **options):
+        stdout, stderr = StringIO(), StringIO()
+        params = {
+            'dry_run': False, 'quiet': False, 'force': False,
+            'no_color': True, 'processes': 1
+        }
+        params.update(options)
+        WebsiteRenderOperation(stdout=stdout, stderr=stderr, **params).run()
+        return stdout.getvalue(), stderr.getvalue()
+
+    def _read(self, relative_path):
+        path = os.path.join(self.render_directory, relative_path)
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def test_render_all(self):
+        output, errors = self._run()
+        self.assertIn('[A] = 2', output)
+        self.assertEqual(errors, '')
+        self.assertEqual(self._read('index.html'), b'<h1></h1>')
+        self.assertEqual(self._read('a/index.html'), b'<h1>Child</h1>')
+        manifest = json.loads(self._read(MANIFEST_FILE_NAME).decode('utf-8'))
+        self.assertEqual(sorted(manifest), ['/', '/a/'])
+
+    def test_inaccessible_pages_skipped(self):
+        Page.objects.create(
+            url='/redirect/',
+            page_processor='powerpages.RedirectProcessor',
+            page_processor_config={'to url': '/a/'}
+        )
+        Page.objects.create(
+            url='/hidden/', page_processor_config={'sitemap': False}
+        )
+        output, errors = self._run()
+        self.assertIn('[A] = 2', output)
+        self.assertEqual(errors, '')
+        self.assertFalse(
+            os.path.exists(os.path.join(self.render_directory, 'redirect'))
+        )
+        self.assertFalse(
+            os.path.exists(os.path.join(self.render_directory, 'hidden'))
+        )
+        output, errors = self._run()
+        self.assertIn('[.] = 2', output)
+        self.assertEqual(errors, '')
+
+    def test_not_changed_pages_not_rendered(self):
+        self._run()
+        output, errors = self._run()
+        self.assertIn('[.] = 2', output)
+        self.assertNotIn('[A] = ', output)
+        self.assertNotIn('[M] = ', output)
+
+    def test_changed_page_rendered(self):
+        self._run()
+        self.child.template = '{% block content %}Changed{% endblock %}'
+        self.child.save()
+        output, errors = self._run()
+        self.assertIn('[.] = 1', output)
+        self.assertIn('[M] = 1', output)
+        self.assertEqual(self._read('a/index.html'), b'<h1>Changed</h1>')
+
+    def test_changed_ancestor_rendered(self):
+        self._run()
+        self.root.template = '<h2>{% block content %}{% endblock %}</h2>'
+        self.root.save()
+        output, errors = self._run()
+        self.assertIn('[M] = 2', output)
+        self.assertEqual(self._read('a/index.html'), b'<h2>Child</h2>')
+
+    def test_force(self):
+        self._run()
+        output, errors = self._run(force=True)
+        self.assertIn('[M!] = 2', output)
+
+    def test_deleted_page_file_removed(self):
+        self._run()
+        self.child.delete()
+        output, errors = self._run()
+        self.assertIn('[D] = 1', output)
+        self.assertFalse(
+            os.path.exists(os.path.join(self.render_directory, 'a/index.html'))
+        )
+
+    def test_dry_run(self):
+        output, errors = self._run(dry_run=True)
+        self.assertIn('[A] = 2', output)
+        self.assertEqual(os.listdir(self.render_directory), [])
+
+    def test_render_error(self):
+        Page.objects.create(url='/broken/', template='{% broken %}')
+        output, errors = self._run()
+        self.assertIn('[As] = 1', output)
+        self.assertIn('TemplateSyntaxError', errors)
+
+    def test_render_with_command(self):
+        stdout, stderr = StringIO(), StringIO()
+        call_command(
+            'website_render',
+            stdout=stdout,
+            stderr=stderr,
+            processes=1,
+            no_color=True,
+        )
+        self.assertIn('[A] = 2', stdout.getvalue())
+        self.assertEqual(self._read('a/index.html'), b'<h1>Child</h1>')
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.core.cache import cache
+from django.core.urlresolvers import NoReverseMatch
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from powerpages.models import Page
+from powerpages.reverse import (
+    reverse_url, reverse_urls, pinned_generation, local_urls
+)
+
+from .utils import CountingCache, COUNTING_CACHES
+
+
+@override_settings(CACHES=COUNTING_CACHES)
+class ReverseURLTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        local_urls.clear()
+        self.page = Page.objects.create(url='/test-page/', alias='test_page')
+
+    def test_alias(self):
+        self.assertEqual(reverse_url('test_page'), '/test-page/')
+
+    def test_django_view(self):
+        self.assertEqual(
+            reverse_url('page', path='test-page/'), '/test-page/'
+        )
+
+    def test_not_found(self):
+        with self.assertRaises(NoReverseMatch):
+            reverse_url('missing_page')
+
+    def test_no_writes_on_hit(self):
+        reverse_url('test_page')
+        local_urls.clear()  # only the shared cache is hit
+        CountingCache.counts.clear()
+        with self.assertNumQueries(0):
+            self.assertEqual(reverse_url('test_page'), '/test-page/')
+            self.assertEqual(reverse_url('test_page'), '/test-page/')
+        self.assertEqual(CountingCache.counts['set'], 0)
+
+    def test_local_hit_within_pinned_generation(self):
+        reverse_url('test_page')
+        with pinned_generation(), self.assertNumQueries(0):
+            CountingCache.counts.clear()
+            for i in range(10):
+                reverse_url('test_page')
+        self.assertEqual(CountingCache.counts['get'], 0)
+
+    def test_url_change_invalidates(self):
+        self.assertEqual(reverse_url('test_page'), '/test-page/')
+        self.page.url = '/moved-page/'
+        self.page.save()
+        self.assertEqual(reverse_url('test_page'), '/moved-page/')
+
+    def test_alias_change_invalidates(self):
+        self.assertEqual(reverse_url('test_page'), '/test-page/')
+        self.page.alias = 'other_page'
+        self.page.save()
+        with self.assertRaises(NoReverseMatch):
+            reverse_url('test_page')
+        self.assertEqual(reverse_url('other_page'), '/test-page/')
+
+    @override_settings(CACHES={
+        'default': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+        }
+    })
+    def test_dummy_cache(self):
+        self.assertEqual(reverse_url('test_page'), '/test-page/')
+        Page.objects.filter(pk=self.page.pk).update(url='/moved-page/')
+        self.assertEqual(reverse_url('test_page'), '/moved-page/')
+        self.assertEqual(len(local_urls), 0)
+
+    @override_settings(POWER_PAGES={'URL_CACHE_SIZE': 1})
+    def test_size_setting(self):
+        Page.objects.create(url='/other-page/', alias='other_page')
+        reverse_url('test_page')
+        reverse_url('other_page')
+        self.assertEqual(len(local_urls), 1)
+
+
+@override_settings(CACHES=COUNTING_CACHES)
+class ReverseURLsTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        local_urls.clear()
+        Page.objects.create(url='/first/', alias='first')
+        Page.objects.create(url='/second/', alias='second')
+
+    def test_batch(self):
+        lookups = [
+            ('first', (), {}),
+            ('page', (), {'path': 'second/'}),
+            ('missing_page', (), {}),
+            ('second', (), {}),
+        ]
+        with self.assertNumQueries(1):
+            urls, generation = reverse_urls(lookups)
+        self.assertEqual(urls, ['/first/', '/second/', None, '/second/'])
+        self.assertIsNotNone(generation)
+        # all found URLs are cached:
+        local_urls.clear()
+        with self.assertNumQueries(0):
+            self.assertEqual(reverse_url('first'), '/first/')
+            self.assertEqual(reverse_url('page', path='second/'), '/second/')
+
+    def test_shared_cache_read_once(self):
+        reverse_url('first')
+        reverse_url('second')
+        local_urls.clear()
+        CountingCache.counts.clear()
+        with self.assertNumQueries(0):
+            urls, generation = reverse_urls(
+                [('first', (), {}), ('second', (), {})]
+            )
+        self.assertEqual(urls, ['/first/', '/second/'])
+        self.assertEqual(CountingCache.counts['get'], 1)  # generation
+        self.assertEqual(CountingCache.counts['get_many'], 1)
+        self.assertEqual(CountingCache.counts['set'], 0)
+
+
+class PageRenderURLsTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        local_urls.clear()
+        Page.objects.create(
+            url='/', alias='home',
+            template='{% page_url home %}|{% block content %}{% endblock %}'
+        )
+        Page.objects.create(url='/first/', alias='first')
+        Page.objects.create(url='/second/', alias='second')
+        Page.objects.create(
+            url='/links/',
+            template='{% block content %}{% page_url first %}|'
+                     '{% page_url second %}|{% page_url page path=path %}'
+                     '{% endblock %}'
+        )
+
+    def render(self):
+        page = Page.objects.get(url='/links/')
+        page_processor = page.get_page_processor()
+        return page_processor.render(
+            page_processor.create_context({'path': 'first/'})
+        )
+
+    def alias_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            output = self.render()
+        self.assertEqual(output, '/|/first/|/second/|/first/')
+        return [
+            query for query in context.captured_queries
+            if '"alias" IN' in query['sql'] or '"alias" =' in query['sql']
+        ]
+
+    def test_batched_after_page_change(self):
+        self.render()
+        Page.objects.create(url='/third/', alias='third')  # new generation
+        # single query for constant tags of the page and its parent:
+        self.assertEqual(len(self.alias_queries()), 1)
+
+    def test_no_queries_when_unchanged(self):
+        self.render()
+        self.assertEqual(len(self.alias_queries()), 0)
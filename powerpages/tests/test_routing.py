@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import override_settings
+from django.core.cache import cache
+from django.db import transaction
+
+from powerpages.models import Page
+from powerpages.routing import PageRoutingTable
+from powerpages.utils.generation import get_generation
+from powerpages import cachekeys
+
+from .utils import CountingCache, COUNTING_CACHES
+
+
+class PageRoutingTableTestCase(TestCase):
+
+    maxDiff = None
+
+    def setUp(self):
+        cache.clear()
+
+    def test_get_route(self):
+        page = Page.objects.create(
+            url='/test/',
+            page_processor_config={'cache': 15}
+        )
+        routing_table = PageRoutingTable()
+        route = routing_table.get_route('/test/')
+        self.assertEqual(route.pk, page.pk)
+        self.assertEqual(route.url, '/test/')
+        self.assertEqual(
+            route.page_processor, 'powerpages.DefaultPageProcessor'
+        )
+        self.assertEqual(route.page_processor_config, 'cache: 15\n')
+        self.assertEqual(
+            routing_table.get_page('/test/').page_processor_config,
+            {'cache': 15}
+        )
+        self.assertEqual(route.changed_at, page.changed_at)
+
+    def test_get_route_missing(self):
+        Page.objects.create(url='/test/')
+        routing_table = PageRoutingTable()
+        self.assertIsNone(routing_table.get_route('/other/'))
+
+    def test_get_page_without_queries(self):
+        page = Page.objects.create(url='/test/', template='<h1>Test</h1>')
+        routing_table = PageRoutingTable()
+        routing_table.refresh()
+        with self.assertNumQueries(0):
+            routed_page = routing_table.get_page('/test/')
+            page_processor = routed_page.get_page_processor()
+        self.assertEqual(routed_page.pk, page.pk)
+        self.assertEqual(page_processor.config.get('cache'), 0)
+        with self.assertNumQueries(1):  # deferred fields
+            routed_page.load_deferred_fields()
+        self.assertEqual(routed_page.template, '<h1>Test</h1>')
+
+    def test_rebuilt_after_save(self):
+        page = Page.objects.create(url='/test/')
+        routing_table = PageRoutingTable()
+        self.assertIsNotNone(routing_table.get_route('/test/'))
+        page.url = '/other/'
+        page.save()
+        self.assertIsNone(routing_table.get_route('/test/'))
+        self.assertEqual(routing_table.get_route('/other/').pk, page.pk)
+
+    def test_rebuilt_after_delete(self):
+        page = Page.objects.create(url='/test/')
+        routing_table = PageRoutingTable()
+        self.assertIsNotNone(routing_table.get_route('/test/'))
+        page.delete()
+        self.assertIsNone(routing_table.get_route('/test/'))
+
+    def test_not_rebuilt_without_changes(self):
+        Page.objects.create(url='/test/')
+        routing_table = PageRoutingTable()
+        routing_table.refresh()
+        with self.assertNumQueries(0):
+            routing_table.get_route('/test/')
+            routing_table.get_route('/other/')
+
+    def test_get_redirect_to_url(self):
+        Page.objects.create(
+            url='/old/',
+            page_processor='powerpages.RedirectProcessor',
+            page_processor_config={'to url': '/new/', 'permanent': False}
+        )
+        routing_table = PageRoutingTable()
+        self.assertEqual(routing_table.get_redirect('/old/'), ('/new/', False))
+
+    def test_get_redirect_to_alias(self):
+        Page.objects.create(
+            url='/old/',
+            page_processor='powerpages.RedirectProcessor',
+            page_processor_config={'to alias': 'new-page'}
+        )
+        Page.objects.create(url='/new/', alias='new-page')
+        routing_table = PageRoutingTable()
+        with self.assertNumQueries(1):  # single query building the table
+            redirect = routing_table.get_redirect('/old/')
+        self.assertEqual(redirect, ('/new/', True))
+
+    def test_get_redirect_to_missing_alias(self):
+        Page.objects.create(
+            url='/old/',
+            page_processor='powerpages.RedirectProcessor',
+            page_processor_config={'to alias': 'missing-page'}
+        )
+        routing_table = PageRoutingTable()
+        self.assertEqual(routing_table.get_redirect('/old/'), ('/', False))
+
+    def test_get_redirect_to_name_not_precomputed(self):
+        Page.objects.create(
+            url='/old/',
+            page_processor='powerpages.RedirectProcessor',
+            page_processor_config={'to name': 'switch_edit_mode'}
+        )
+        routing_table = PageRoutingTable()
+        self.assertIsNone(routing_table.get_redirect('/old/'))
+        self.assertIsNotNone(routing_table.get_route('/old/'))
+
+    def test_get_redirect_not_redirect(self):
+        Page.objects.create(url='/test/')
+        routing_table = PageRoutingTable()
+        self.assertIsNone(routing_table.get_redirect('/test/'))
+        self.assertIsNone(routing_table.get_redirect('/other/'))
+
+    def test_redirect_rebuilt_after_target_changed(self):
+        Page.objects.create(
+            url='/old/',
+            page_processor='powerpages.RedirectProcessor',
+            page_processor_config={'to alias': 'new-page'}
+        )
+        target = Page.objects.create(url='/new/', alias='new-page')
+        routing_table = PageRoutingTable()
+        self.assertEqual(routing_table.get_redirect('/old/'), ('/new/', True))
+        target.url = '/newer/'
+        target.save()
+        self.assertEqual(
+            routing_table.get_redirect('/old/'), ('/newer/', True)
+        )
+
+    @override_settings(CACHES=COUNTING_CACHES)
+    def test_pinned_refreshed_once(self):
+        Page.objects.create(url='/a/')
+        Page.objects.create(url='/a/b/')
+        routing_table = PageRoutingTable()
+        routing_table.refresh()
+        CountingCache.counts.clear()
+        with routing_table.pinned():
+            routing_table.get_redirect('/a/b/')
+            routing_table.get_page('/a/b/')
+            routing_table.get_ancestor_routes('/a/b/')
+            routing_table.get_ancestor_routes('/a/b/')
+        self.assertEqual(CountingCache.counts['get'], 1)
+        routing_table.get_route('/a/')  # refreshed again outside the block
+        self.assertEqual(CountingCache.counts['get'], 2)
+
+
+class PageRoutingTableCommitTestCase(TransactionTestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_rebuilt_after_commit(self):
+        routing_table = PageRoutingTable()
+        with transaction.atomic():
+            Page.objects.create(url='/other/')
+            # other process rebuilds the table before the commit:
+            routing_table.refresh()
+            generation = get_generation(cachekeys.PAGES_GENERATION)
+            self.assertIsNotNone(routing_table.get_route('/other/'))
+        self.assertNotEqual(
+            get_generation(cachekeys.PAGES_GENERATION), generation
+        )
+        self.assertTrue(routing_table.refresh())
+        self.assertNotEqual(routing_table.generation, generation)
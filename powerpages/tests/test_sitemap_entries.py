@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import datetime
+
+from django.test import TestCase
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.urlresolvers import reverse
+from django.contrib.auth.models import User
+from django.utils import six
+
+from powerpages.models import Page, SitemapEntry
+from powerpages.sitemap import PageSitemap
+from powerpages.sitemap_config import ModelSitemap
+from powerpages import sitemap_entries
+
+from .test_sitemap_view import parse_sitemap
+
+
+class UserSitemap(ModelSitemap):
+    queryset = User.objects.filter(is_active=True)
+    incremental = True
+
+    def get_instance_location(self, obj):
+        return '/users/{0}/'.format(obj.username)
+
+
+class PageSitemapEntriesTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.page = Page.objects.create(url='/test/')
+
+    def get_entries(self):
+        return list(
+            SitemapEntry.objects.filter(section='page').values_list(
+                'object_key', 'location', 'lastmod', 'priority'
+            )
+        )
+
+    def test_created(self):
+        self.assertEqual(
+            self.get_entries(),
+            [('{0}'.format(self.page.pk), '/test/',
+              self.page.changed_at.date(), None)]
+        )
+
+    def test_updated(self):
+        self.page.url = '/moved/'
+        self.page.page_processor_config = {
+            'sitemap': {'lastmod': '2017-01-24', 'priority': 0.5}
+        }
+        self.page.save()
+        self.assertEqual(
+            self.get_entries(),
+            [('{0}'.format(self.page.pk), '/moved/',
+              datetime.date(2017, 1, 24), 0.5)]
+        )
+
+    def test_excluded(self):
+        self.page.page_processor_config = {'sitemap': False}
+        self.page.save()
+        self.assertEqual(self.get_entries(), [])
+
+    def test_deleted(self):
+        self.page.delete()
+        self.assertEqual(self.get_entries(), [])
+
+    def test_sitemap_from_entries(self):
+        sitemap_url = reverse('sitemap')
+        content = self.client.get(sitemap_url).content
+        self.assertEqual(
+            [url['loc'] for url in parse_sitemap(content)],
+            ['http://testserver/test/']
+        )
+        self.page.url = '/moved/'
+        self.page.save()
+        # single query for stored entries:
+        with self.assertNumQueries(1):
+            content = self.client.get(sitemap_url).content
+        self.assertEqual(
+            [url['loc'] for url in parse_sitemap(content)],
+            ['http://testserver/moved/']
+        )
+
+    def test_rebuild(self):
+        Page.objects.filter(pk=self.page.pk).update(url='/moved/')
+        Page.objects.bulk_create([Page(url='/other/')])
+        self.assertEqual(sitemap_entries.rebuild_entries(PageSitemap), 2)
+        self.assertEqual(
+            sorted(location for key, location, lastmod, priority
+                   in self.get_entries()),
+            ['/moved/', '/other/']
+        )
+
+    def test_rebuild_chunks(self):
+        Page.objects.bulk_create([
+            Page(url='/other-{0}/'.format(number)) for number in range(4)
+        ])
+        self.assertEqual(
+            sitemap_entries.rebuild_entries(PageSitemap, chunk_size=2), 5
+        )
+        self.assertEqual(len(self.get_entries()), 5)
+
+    def test_rebuild_command(self):
+        Page.objects.filter(pk=self.page.pk).update(url='/moved/')
+        output = six.StringIO()
+        call_command('website_sitemap', rebuild_entries=True, stdout=output)
+        self.assertEqual(output.getvalue(), 'ENTRIES: page (1)\n')
+        self.assertEqual(self.get_entries()[0][1], '/moved/')
+
+
+class ModelSitemapEntriesTestCase(TestCase):
+
+    def setUp(self):
+        sitemap_entries.connect(UserSitemap)
+
+    def tearDown(self):
+        sitemap_entries.disconnect(UserSitemap)
+
+    def get_locations(self):
+        return [url.location for url in UserSitemap().get_urls()]
+
+    def test_opt_in(self):
+        user = User.objects.create_user('alice')
+        self.assertEqual(
+            self.get_locations(), ['http://localhost/users/alice/']
+        )
+        user.is_active = False
+        user.save()
+        self.assertEqual(self.get_locations(), [])
+        user.is_active = True
+        user.save()
+        user.delete()
+        self.assertEqual(self.get_locations(), [])
+
+    def test_count_and_slice(self):
+        for username in ('alice', 'bob', 'carol'):
+            User.objects.create_user(username)
+        sitemap = UserSitemap()
+        self.assertEqual(sitemap.count_items(), 3)
+        self.assertEqual(
+            [url.location for url in sitemap.get_urls(1, 2)],
+            ['http://localhost/users/bob/']
+        )
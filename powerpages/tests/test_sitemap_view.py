@@ -2,14 +2,25 @@
 
 from __future__ import unicode_literals
 
+import os
 import re
+import gzip
+import shutil
+import tempfile
 
 from django.utils import six
-from django.test import TestCase
+from django.test import TestCase, RequestFactory
 from django.test.utils import override_settings
 from django.core.urlresolvers import reverse
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.core.management.base import CommandError
 
 from powerpages.models import Page
+from powerpages.sitemap_config import Sitemap, ModelSitemap, URLSet
+from powerpages import sitemap_cache
+from powerpages import sitemap
 
 
 # TODO: tests for sitemap config options
@@ -24,7 +35,8 @@ def parse_sitemap(content):
     if urlset_match:
         results = []
         urlset_content = urlset_match.groupdict()['urls']
-        for url_content in re.findall(r'<url>([\s\S]+)</url>', urlset_content):
+        url_contents = re.findall(r'<url>([\s\S]+?)</url>', urlset_content)
+        for url_content in url_contents:
             results.append(
                 dict(
                     re.findall(r'<([^>]+)>([^<]*)</[^>]+>', url_content)
@@ -39,6 +51,9 @@ class PageSitemapTestCase(TestCase):
 
     maxDiff = None
 
+    def setUp(self):
+        cache.clear()
+
     def test_sitemap_view_empty(self):
         url = reverse('sitemap')
         response = self.client.get(url)
@@ -227,3 +242,363 @@ class PageSitemapTestCase(TestCase):
                 }
             ]
         )
+
+
+class SitemapCacheTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.page = Page.objects.create(url='/test/')
+
+    def get_locations(self, **extra):
+        response = self.client.get(reverse('sitemap'), **extra)
+        self.assertEqual(response.status_code, 200)
+        return [url['loc'] for url in parse_sitemap(response.content)]
+
+    def test_cached(self):
+        self.assertEqual(self.get_locations(), ['http://testserver/test/'])
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                self.get_locations(), ['http://testserver/test/']
+            )
+
+    def test_invalidated_on_save(self):
+        self.assertEqual(self.get_locations(), ['http://testserver/test/'])
+        self.page.url = '/moved/'
+        self.page.save()
+        self.assertEqual(self.get_locations(), ['http://testserver/moved/'])
+
+    def test_invalidated_on_delete(self):
+        self.assertEqual(self.get_locations(), ['http://testserver/test/'])
+        self.page.delete()
+        self.assertEqual(self.get_locations(), [])
+
+    @override_settings(ALLOWED_HOSTS=['testserver', 'example.com'])
+    def test_cached_per_protocol_and_host(self):
+        self.assertEqual(self.get_locations(), ['http://testserver/test/'])
+        self.assertEqual(
+            self.get_locations(HTTP_HOST='example.com'),
+            ['http://example.com/test/']
+        )
+        self.assertEqual(
+            self.get_locations(secure=True), ['https://testserver/test/']
+        )
+
+    def test_rebuild_command(self):
+        output = six.StringIO()
+        call_command('website_sitemap', 'testserver', stdout=output)
+        self.assertTrue(output.getvalue().startswith('REBUILT: http://'))
+        Page.objects.filter(pk=self.page.pk).update(url='/moved/')
+        # served from the cache:
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                self.get_locations(), ['http://testserver/test/']
+            )
+
+
+@override_settings(POWER_PAGES={'SITEMAP_STREAMING': True})
+class SitemapStreamingTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        for i in range(5):
+            Page.objects.create(url='/test-{0}/'.format(i))
+
+    def test_streamed(self):
+        response = self.client.get(reverse('sitemap'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/xml')
+        content = b''.join(response.streaming_content)
+        self.assertEqual(
+            sorted(url['loc'] for url in parse_sitemap(content)),
+            ['http://testserver/test-{0}/'.format(i) for i in range(5)]
+        )
+
+    def test_chunks(self):
+        chunk_size = sitemap_cache.CHUNK_SIZE
+        sitemap_cache.CHUNK_SIZE = 2
+        try:
+            chunks = list(
+                sitemap_cache.stream_sitemap(RequestFactory().get('/'))
+            )
+        finally:
+            sitemap_cache.CHUNK_SIZE = chunk_size
+        # start, 3 chunks of URLs, end:
+        self.assertEqual(len(chunks), 5)
+        self.assertEqual(len(parse_sitemap(''.join(chunks))), 5)
+
+    def test_url_slots(self):
+        url = Sitemap.URL('http://testserver/test/')
+        with self.assertRaises(AttributeError):
+            url.extra = True
+
+
+def parse_sitemap_index(content):
+    if not isinstance(content, six.text_type):
+        content = content.decode('utf-8')
+    return re.findall(r'<sitemap>\s*<loc>([^<]*)</loc>', content)
+
+
+@override_settings(
+    POWER_PAGES={'SITEMAP_INDEX': True, 'SITEMAP_SHARD_SIZE': 2}
+)
+class SitemapIndexTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        for i in range(5):
+            Page.objects.create(url='/test-{0}/'.format(i))
+
+    def get_shard_locations(self, number, section='page'):
+        response = self.client.get(
+            reverse(
+                'sitemap_shard',
+                kwargs={'section': section, 'number': number}
+            )
+        )
+        self.assertEqual(response.status_code, 200)
+        return [url['loc'] for url in parse_sitemap(response.content)]
+
+    def test_index(self):
+        response = self.client.get(reverse('sitemap'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            parse_sitemap_index(response.content),
+            [
+                'http://testserver/sitemap-page-1.xml',
+                'http://testserver/sitemap-page-2.xml',
+                'http://testserver/sitemap-page-3.xml',
+            ]
+        )
+
+    def test_shards(self):
+        locations = []
+        for number in (1, 2, 3):
+            locations.extend(self.get_shard_locations(number))
+        self.assertEqual(
+            locations,
+            ['http://testserver/test-{0}/'.format(i) for i in range(5)]
+        )
+        self.assertEqual(len(self.get_shard_locations(3)), 1)
+
+    def test_shard_cached(self):
+        self.get_shard_locations(1)
+        with self.assertNumQueries(0):
+            self.assertEqual(len(self.get_shard_locations(1)), 2)
+
+    @override_settings(POWER_PAGES={
+        'SITEMAP_INDEX': True, 'SITEMAP_SHARD_SIZE': 2,
+        'SITEMAP_STREAMING': True
+    })
+    def test_shard_streamed(self):
+        url = reverse('sitemap_shard', kwargs={'section': 'page', 'number': 2})
+        response = self.client.get(url)
+        self.assertTrue(response.streaming)
+        self.assertEqual(
+            [
+                url['loc'] for url in
+                parse_sitemap(b''.join(response.streaming_content))
+            ],
+            ['http://testserver/test-2/', 'http://testserver/test-3/']
+        )
+
+    def test_missing_shards(self):
+        for section, number in (('page', 4), ('page', 0), ('other', 1)):
+            url = reverse(
+                'sitemap_shard',
+                kwargs={'section': section, 'number': number}
+            )
+            self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_missing_shard_page(self):
+        Page.objects.create(
+            url='/sitemap-page-4.xml', template='<shard/>',
+            page_processor_config={'sitemap': False}
+        )
+        url = reverse('sitemap_shard', kwargs={'section': 'page', 'number': 4})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'<shard/>')
+
+    @override_settings(ROOT_URLCONF='powerpages.tests.namespaced_urls')
+    def test_namespaced_urls(self):
+        response = self.client.get(reverse('powerpages:sitemap'))
+        self.assertEqual(
+            parse_sitemap_index(response.content),
+            ['http://testserver/sitemap-page-{0}.xml'.format(number)
+             for number in (1, 2, 3)]
+        )
+        response = self.client.get('/sitemap-page-3.xml')
+        self.assertEqual(len(parse_sitemap(response.content)), 1)
+
+    @override_settings(POWER_PAGES={})
+    def test_index_disabled(self):
+        url = reverse('sitemap_shard', kwargs={'section': 'page', 'number': 1})
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    @override_settings(POWER_PAGES={})
+    def test_index_disabled_page(self):
+        Page.objects.create(url='/sitemap-page-1.xml', template='<page/>')
+        url = reverse('sitemap_shard', kwargs={'section': 'page', 'number': 1})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'<page/>')
+
+    def test_rebuild_command(self):
+        call_command('website_sitemap', 'testserver', stdout=six.StringIO())
+        with self.assertNumQueries(0):
+            self.client.get(reverse('sitemap'))
+            self.assertEqual(len(self.get_shard_locations(2)), 2)
+
+
+class SitemapSectionsTestCase(TestCase):
+
+    def test_section_names(self):
+        class OtherSitemap(Sitemap):
+            pass
+
+        class Extra(Sitemap):
+            section = 'extra-urls'
+
+        self.assertEqual(OtherSitemap.get_section(), 'other')
+        self.assertEqual(Extra.get_section(), 'extra-urls')
+        urlset = URLSet()
+        urlset.add(OtherSitemap)
+        urlset.add(Extra)
+        self.assertEqual(list(urlset.sections()), ['extra-urls', 'other'])
+
+    def test_duplicated_sections(self):
+        class PageSitemap(Sitemap):
+            pass
+
+        urlset = URLSet()
+        urlset.add(PageSitemap)
+        urlset.add(sitemap.PageSitemap)
+        with self.assertRaises(ImproperlyConfigured):
+            urlset.sections()
+
+    def test_model_sitemap_slice(self):
+        class PageModelSitemap(ModelSitemap):
+            queryset = Page.objects.all()
+
+        for i in range(3):
+            Page.objects.create(url='/test-{0}/'.format(i))
+        model_sitemap = PageModelSitemap()
+        self.assertEqual(model_sitemap.count_items(), 3)
+        self.assertEqual(
+            [url.location for url in model_sitemap.get_urls(1, 3)],
+            ['http://localhost/test-1/', 'http://localhost/test-2/']
+        )
+
+
+class SitemapFilesTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.sitemap_directory = tempfile.mkdtemp()
+        for i in range(3):
+            Page.objects.create(url='/test-{0}/'.format(i))
+
+    def tearDown(self):
+        shutil.rmtree(self.sitemap_directory)
+
+    def get_host_directory(self, scheme='http', host='testserver'):
+        return os.path.join(self.sitemap_directory, scheme, host)
+
+    def write(self, **settings):
+        settings['SITEMAP_DIRECTORY'] = self.sitemap_directory
+        with override_settings(POWER_PAGES=settings):
+            output = six.StringIO()
+            call_command(
+                'website_sitemap', 'testserver', write=True, stdout=output
+            )
+        return output.getvalue()
+
+    def get(self, url, accept_encoding='gzip, deflate', **settings):
+        settings['SITEMAP_DIRECTORY'] = self.sitemap_directory
+        with override_settings(POWER_PAGES=settings):
+            return self.client.get(url, HTTP_ACCEPT_ENCODING=accept_encoding)
+
+    def test_files_written(self):
+        self.assertEqual(
+            self.write(), 'WRITTEN: http://testserver/sitemap.xml\n'
+        )
+        self.assertEqual(
+            sorted(os.listdir(self.get_host_directory())),
+            ['sitemap.xml', 'sitemap.xml.gz']
+        )
+        path = os.path.join(self.get_host_directory(), 'sitemap.xml')
+        with open(path, 'rb') as f:
+            content = f.read()
+        with gzip.GzipFile('{0}.gz'.format(path), 'rb') as f:
+            self.assertEqual(f.read(), content)
+        self.assertEqual(len(parse_sitemap(content)), 3)
+
+    def test_gzipped_file_served(self):
+        self.write()
+        Page.objects.create(url='/test-3/')  # not in the files
+        with self.assertNumQueries(0):
+            response = self.get(reverse('sitemap'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        content = gzip.GzipFile(
+            fileobj=six.BytesIO(b''.join(response.streaming_content))
+        ).read()
+        self.assertEqual(len(parse_sitemap(content)), 3)
+
+    def test_plain_file_served(self):
+        self.write()
+        for accept_encoding in ('', 'deflate', 'gzip;q=0', 'gzip; q=0.0'):
+            response = self.get(
+                reverse('sitemap'), accept_encoding=accept_encoding
+            )
+            self.assertNotIn('Content-Encoding', response)
+            content = b''.join(response.streaming_content)
+            self.assertEqual(len(parse_sitemap(content)), 3)
+
+    def test_files_of_other_host_not_served(self):
+        self.write()
+        Page.objects.create(url='/test-3/')  # not in the files
+        with override_settings(
+            POWER_PAGES={'SITEMAP_DIRECTORY': self.sitemap_directory},
+            ALLOWED_HOSTS=['testserver', 'other.example.com']
+        ):
+            response = self.client.get(
+                reverse('sitemap'), HTTP_HOST='other.example.com'
+            )
+            self.assertEqual(len(parse_sitemap(response.content)), 4)
+            response = self.client.get(reverse('sitemap'), secure=True)
+        self.assertEqual(len(parse_sitemap(response.content)), 4)
+
+    def test_generated_without_files(self):
+        response = self.get(reverse('sitemap'))
+        self.assertNotIn('Content-Encoding', response)
+        self.assertEqual(len(parse_sitemap(response.content)), 3)
+
+    def test_shards(self):
+        settings = {'SITEMAP_INDEX': True, 'SITEMAP_SHARD_SIZE': 2}
+        self.assertEqual(
+            self.write(**settings),
+            'WRITTEN: http://testserver/sitemap-page-1.xml\n'
+            'WRITTEN: http://testserver/sitemap-page-2.xml\n'
+            'WRITTEN: http://testserver/sitemap.xml\n'
+        )
+        response = self.get(
+            reverse('sitemap_shard', kwargs={'section': 'page', 'number': 2}),
+            **settings
+        )
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        # obsolete shards are removed:
+        settings['SITEMAP_SHARD_SIZE'] = 5
+        self.write(**settings)
+        self.assertEqual(
+            sorted(os.listdir(self.get_host_directory())),
+            ['sitemap-page-1.xml', 'sitemap-page-1.xml.gz',
+             'sitemap.xml', 'sitemap.xml.gz']
+        )
+
+    def test_directory_required(self):
+        with self.assertRaises(CommandError):
+            call_command('website_sitemap', 'testserver', write=True)
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+from django.test import TestCase, override_settings
+from django.core.cache import cache
+
+from powerpages.models import Page
+from powerpages import template_cache
+
+
+class TemplateCacheTestCase(TestCase):
+
+    maxDiff = None
+
+    def setUp(self):
+        cache.clear()
+        template_cache.compiled_templates.clear()
+
+    def test_get_template_compiled_once(self):
+        first = template_cache.get_template(1, '<h1>{{ title }}</h1>')
+        second = template_cache.get_template(1, '<h1>{{ title }}</h1>')
+        self.assertIs(first, second)
+        self.assertEqual(template_cache.stats()['hits'], 1)
+        self.assertEqual(template_cache.stats()['misses'], 1)
+
+    def test_get_template_changed_source(self):
+        first = template_cache.get_template(1, '<h1>{{ title }}</h1>')
+        second = template_cache.get_template(1, '<h2>{{ title }}</h2>')
+        self.assertIsNot(first, second)
+
+    def test_evict(self):
+        template_cache.get_template(1, '<h1>{{ title }}</h1>')
+        template_cache.get_template('1', 'page', name='page/1')
+        template_cache.get_template(2, '<h1>{{ title }}</h1>')
+        template_cache.evict(1)
+        self.assertEqual(template_cache.stats()['size'], 1)
+
+    @override_settings(POWER_PAGES={'TEMPLATE_CACHE_SIZE': 1})
+    def test_size_setting(self):
+        template_cache.get_template(1, '<h1>{{ title }}</h1>')
+        template_cache.get_template(2, '<h1>{{ title }}</h1>')
+        self.assertEqual(template_cache.stats()['size'], 1)
+        self.assertEqual(template_cache.stats()['maxsize'], 1)
+
+    def test_page_view_uses_compiled_templates(self):
+        Page.objects.create(
+            url='/',
+            template='<h1>{% block header %}Root{% endblock %}</h1>'
+        )
+        Page.objects.create(
+            url='/a/',
+            template='{% block header %}Child{% endblock %}'
+        )
+        self.client.get('/a/')
+        misses = template_cache.stats()['misses']
+        response = self.client.get('/a/')
+        self.assertContains(response, '<h1>Child</h1>')
+        self.assertEqual(template_cache.stats()['misses'], misses)
+
+    def test_page_changed_evicts_templates(self):
+        page = Page.objects.create(url='/', template='<h1>Old</h1>')
+        self.client.get('/')
+        self.assertEqual(template_cache.stats()['size'], 1)
+        page.template = '<h1>New</h1>'
+        page.save()
+        self.assertEqual(template_cache.stats()['size'], 0)
+        response = self.client.get('/')
+        self.assertContains(response, '<h1>New</h1>')
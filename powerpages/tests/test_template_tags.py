@@ -3,10 +3,19 @@
 from __future__ import unicode_literals
 
 from django.test import TestCase
+from django.test.utils import override_settings
 from django.template import Template, Context
+from django.core.cache import cache
 from django.utils import six
 
 from powerpages.models import Page
+from powerpages.reverse import pinned_generation, local_urls
+from powerpages.templatetags.powerpages_tags import (
+    PageURLNode, get_constant_url_nodes, get_parent_page_template
+)
+from powerpages import template_cache
+
+from .utils import CountingCache, COUNTING_CACHES
 
 
 class TemplateTagsTestCase(TestCase):
@@ -73,3 +82,100 @@ class TemplateTagsTestCase(TestCase):
         if not isinstance(content, six.text_type):
             content = content.decode('utf-8')
         self.assertEqual(content, '')
+
+
+@override_settings(CACHES=COUNTING_CACHES)
+class PageURLConstantTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        local_urls.clear()
+        self.page = Page.objects.create(url='/test-page/', alias='test_page')
+
+    def get_node(self, template):
+        return template.nodelist.get_nodes_by_type(PageURLNode)[0]
+
+    def test_literal_arguments_resolved_at_parse_time(self):
+        template = Template(
+            '{% load powerpages_tags %}{% page_url page path="test-page/" %}'
+        )
+        node = self.get_node(template)
+        self.assertTrue(node.constant)
+        self.assertEqual(node.constant_url[1], '/test-page/')
+        with pinned_generation(), self.assertNumQueries(0):
+            CountingCache.counts.clear()
+            self.assertEqual(template.render(Context()), '/test-page/')
+        self.assertEqual(CountingCache.counts['get'], 0)
+
+    def test_constant_nodes_memoized(self):
+        template = Template(
+            '{% load powerpages_tags %}'
+            '{% page_url test_page %}{% page_url page path=path %}'
+        )
+        nodes = get_constant_url_nodes(template)
+        self.assertEqual(nodes, [self.get_node(template)])
+        self.assertIs(get_constant_url_nodes(template), nodes)
+
+    def test_variable_arguments_not_constant(self):
+        template = Template(
+            '{% load powerpages_tags %}{% page_url page path=path %}'
+        )
+        node = self.get_node(template)
+        self.assertFalse(node.constant)
+        self.assertIsNone(node.constant_url)
+        self.assertEqual(
+            template.render(Context({'path': 'test-page/'})), '/test-page/'
+        )
+
+    def test_filtered_literal_not_constant(self):
+        template = Template(
+            '{% load powerpages_tags %}'
+            '{% page_url page path="TEST-PAGE/"|lower %}'
+        )
+        self.assertFalse(self.get_node(template).constant)
+        self.assertEqual(template.render(Context()), '/test-page/')
+
+    def test_resolved_again_after_page_change(self):
+        template = Template(
+            '{% load powerpages_tags %}{% page_url test_page %}'
+        )
+        self.assertEqual(template.render(Context()), '/test-page/')
+        self.page.url = '/moved-page/'
+        self.page.save()
+        self.assertEqual(template.render(Context()), '/moved-page/')
+
+    def test_missing_page_created_later(self):
+        template = Template(
+            '{% load powerpages_tags %}{% page_url other_page %}'
+        )
+        self.assertIsNone(self.get_node(template).constant_url)
+        Page.objects.create(url='/other-page/', alias='other_page')
+        self.assertEqual(template.render(Context()), '/other-page/')
+
+
+class ParentPageTemplateTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_memoized_until_page_changed(self):
+        root = Page.objects.create(
+            url='/', template='<h1>{% block title %}{% endblock %}</h1>'
+        )
+        page = Page.objects.create(
+            url='/a/', template='{% block title %}A{% endblock %}'
+        )
+        compiled_template = template_cache.get_template(
+            page.pk, page.get_page_processor().get_template_source()
+        )
+        parent_template = get_parent_page_template(compiled_template)
+        self.assertIsNotNone(parent_template)
+        with self.assertNumQueries(0):
+            self.assertIs(
+                get_parent_page_template(compiled_template), parent_template
+            )
+        root.template = '<h2>{% block title %}{% endblock %}</h2>'
+        root.save()
+        self.assertIsNot(
+            get_parent_page_template(compiled_template), parent_template
+        )
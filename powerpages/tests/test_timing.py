@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.core.cache import cache
+from django.contrib.auth.models import User
+
+from powerpages.models import Page
+from powerpages.signals import page_timed
+from powerpages.timing import PageTimer, NullTimer
+
+
+class PageTimerTestCase(TestCase):
+
+    def test_phases_summed(self):
+        timer = PageTimer()
+        timer.add('render', 0.001)
+        timer.add('route', 0.002)
+        timer.add('render', 0.0005)
+        self.assertEqual(list(timer.timings), ['render', 'route'])
+        self.assertAlmostEqual(timer.timings['render'], 0.0015)
+
+    def test_phase(self):
+        timer = PageTimer()
+        with timer.phase('route'):
+            pass
+        self.assertGreaterEqual(timer.timings['route'], 0)
+
+    def test_header_value(self):
+        timer = PageTimer()
+        timer.add('route', 0.0001)
+        timer.add('render', 0.0125)
+        self.assertEqual(
+            timer.header_value(), 'route;dur=0.100, render;dur=12.500'
+        )
+
+    def test_null_timer(self):
+        timer = NullTimer()
+        with timer.phase('route'):
+            pass
+        self.assertFalse(timer.enabled)
+
+
+class PageTimingViewTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        Page.objects.create(url='/test/', template='<h1>Hello world!</h1>')
+        User.objects.create_user(
+            'staff_member', password='letmein123', is_staff=True
+        )
+        User.objects.create_user('user', password='letmein123')
+
+    def test_disabled(self):
+        self.client.login(username='staff_member', password='letmein123')
+        response = self.client.get('/test/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Server-Timing', response)
+
+    @override_settings(POWER_PAGES={'SERVER_TIMING': True})
+    def test_header_for_staff(self):
+        self.client.login(username='staff_member', password='letmein123')
+        response = self.client.get('/test/')
+        self.assertEqual(response.status_code, 200)
+        phases = [
+            metric.split(';')[0]
+            for metric in response['Server-Timing'].split(', ')
+        ]
+        self.assertEqual(
+            phases,
+            ['route', 'config', 'processor', 'cache_get', 'context',
+             'compile', 'render']
+        )
+
+    @override_settings(POWER_PAGES={'SERVER_TIMING': True})
+    def test_no_header_for_other_users(self):
+        self.client.login(username='user', password='letmein123')
+        response = self.client.get('/test/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Server-Timing', response)
+
+    def test_signal(self):
+        received = []
+
+        def handler(sender, **kwargs):
+            received.append(kwargs)
+
+        page_timed.connect(handler)
+        try:
+            response = self.client.get('/test/')
+        finally:
+            page_timed.disconnect(handler)
+        self.assertEqual(len(received), 1)
+        self.assertEqual(received[0]['page'].url, '/test/')
+        self.assertIs(received[0]['response'], response)
+        self.assertIn('render', received[0]['timings'])
+        self.assertNotIn('Server-Timing', response)
@@ -2,10 +2,17 @@
 
 from __future__ import unicode_literals
 
-from django.test import TestCase
+import yaml
+
+from django.test import TestCase, override_settings
 from django.utils.six import StringIO
 
 from powerpages.utils.console import Console, ProgressBar
+from powerpages.utils.lru_cache import LRUCache
+from powerpages.utils.imports import import_callable, resolved_callables
+from powerpages.utils.class_registry.dbfields import (
+    load_yaml, parsed_configs
+)
 
 
 class ConsoleTestCase(TestCase):
@@ -188,4 +195,138 @@ class ProgressBarTestCase(TestCase):
                 '[**** ]  80.00% (40 / 50)',
                 '[*****] 100.00% (50 / 50)'
             ]
-        )
\ No newline at end of file
+        )
+
+
+class LRUCacheTestCase(TestCase):
+
+    maxDiff = None
+
+    def test_get_set(self):
+        lru_cache = LRUCache(maxsize=2)
+        lru_cache.set('a', 1)
+        self.assertEqual(lru_cache.get('a'), 1)
+        self.assertIsNone(lru_cache.get('b'))
+        self.assertEqual(lru_cache.get('b', 2), 2)
+        self.assertEqual(
+            lru_cache.stats(),
+            {'hits': 1, 'misses': 2, 'size': 1, 'maxsize': 2}
+        )
+
+    def test_least_recently_used_discarded(self):
+        lru_cache = LRUCache(maxsize=2)
+        lru_cache.set('a', 1)
+        lru_cache.set('b', 2)
+        lru_cache.get('a')
+        lru_cache.set('c', 3)
+        self.assertIn('a', lru_cache)
+        self.assertNotIn('b', lru_cache)
+        self.assertIn('c', lru_cache)
+        self.assertEqual(len(lru_cache), 2)
+
+    def test_delete(self):
+        lru_cache = LRUCache(maxsize=2)
+        lru_cache.set('a', 1)
+        lru_cache.delete('a')
+        lru_cache.delete('b')
+        self.assertNotIn('a', lru_cache)
+
+    def test_delete_matching(self):
+        lru_cache = LRUCache(maxsize=10)
+        lru_cache.set(('a', 1), 1)
+        lru_cache.set(('a', 2), 2)
+        lru_cache.set(('b', 1), 3)
+        lru_cache.delete_matching(lambda key: key[0] == 'a')
+        self.assertEqual(list(lru_cache.data), [('b', 1)])
+
+    def test_clear(self):
+        lru_cache = LRUCache(maxsize=2)
+        lru_cache.set('a', 1)
+        lru_cache.get('a')
+        lru_cache.clear()
+        self.assertEqual(
+            lru_cache.stats(),
+            {'hits': 0, 'misses': 0, 'size': 0, 'maxsize': 2}
+        )
+
+    def test_callable_maxsize(self):
+        sizes = [2]
+        lru_cache = LRUCache(maxsize=lambda: sizes[0])
+        lru_cache.set('a', 1)
+        lru_cache.set('b', 2)
+        self.assertEqual(lru_cache.maxsize, 2)
+        sizes[0] = 1
+        lru_cache.set('c', 3)
+        self.assertEqual(list(lru_cache.data), ['c'])
+        self.assertEqual(lru_cache.stats()['maxsize'], 1)
+
+
+class LoadYAMLTestCase(TestCase):
+
+    def setUp(self):
+        parsed_configs.clear()
+
+    def test_load(self):
+        self.assertEqual(
+            load_yaml('cache: 15\nheaders: {x-magic: 42}\n'),
+            {'cache': 15, 'headers': {'x-magic': 42}}
+        )
+
+    def test_memoized(self):
+        load_yaml('cache: 15\n')
+        load_yaml('cache: 15\n')
+        load_yaml('cache: 30\n')
+        self.assertEqual(parsed_configs.stats()['hits'], 1)
+        self.assertEqual(parsed_configs.stats()['size'], 2)
+
+    @override_settings(POWER_PAGES={'CONFIG_CACHE_SIZE': 1})
+    def test_size_setting(self):
+        load_yaml('cache: 15\n')
+        load_yaml('cache: 30\n')
+        self.assertEqual(parsed_configs.stats()['size'], 1)
+
+    def test_memoized_value_not_mutated(self):
+        data = load_yaml('headers: {x-magic: 42}\n')
+        data['headers']['x-magic'] = 0
+        self.assertEqual(
+            load_yaml('headers: {x-magic: 42}\n'),
+            {'headers': {'x-magic': 42}}
+        )
+
+    def test_unsafe_tags_not_loaded(self):
+        with self.assertRaises(yaml.YAMLError):
+            load_yaml('!!python/object/apply:os.getcwd []\n')
+
+
+class ImportCallableTestCase(TestCase):
+
+    def setUp(self):
+        resolved_callables.clear()
+
+    def test_import(self):
+        from powerpages.tests.utils import context_processor
+        self.assertIs(
+            import_callable('powerpages.tests.utils.context_processor'),
+            context_processor
+        )
+
+    def test_memoized(self):
+        import_callable('powerpages.tests.utils.context_processor')
+        self.assertIn(
+            'powerpages.tests.utils.context_processor', resolved_callables
+        )
+
+    def test_missing(self):
+        with self.assertRaises(ImportError):
+            import_callable('powerpages.tests.utils.missing')
+        with self.assertRaises(ImportError):
+            import_callable('powerpages.tests.missing.context_processor')
+
+    def test_not_callable(self):
+        with self.assertRaises(ImportError):
+            import_callable('powerpages.tests.utils.calls')
+
+    def test_not_string(self):
+        for dotted_path in (123, ['powerpages.tests.utils'], {'a': 1}):
+            with self.assertRaises(ImportError):
+                import_callable(dotted_path)
@@ -2,8 +2,51 @@
 
 from __future__ import unicode_literals
 
+import collections
+
+from django.core.cache.backends.locmem import LocMemCache
+
 
 def context_processor(request):
     return {
         'magic_number': 42
     }
+
+
+calls = []
+
+
+def counting_context_processor(request):
+    calls.append(request.path)
+    return {}
+
+
+class CountingCache(LocMemCache):
+    """Local memory cache counting calls of `get`, `get_many` and `set`"""
+
+    counts = collections.Counter()
+
+    def get(self, *args, **kwargs):
+        self.counts['get'] += 1
+        return super(CountingCache, self).get(*args, **kwargs)
+
+    def get_many(self, keys, version=None):
+        self.counts['get_many'] += 1
+        return dict(
+            (key, value) for key, value in (
+                (key, super(CountingCache, self).get(key, version=version))
+                for key in keys
+            ) if value is not None
+        )
+
+    def set(self, *args, **kwargs):
+        self.counts['set'] += 1
+        return super(CountingCache, self).set(*args, **kwargs)
+
+
+COUNTING_CACHES = {
+    'default': {
+        'BACKEND': 'powerpages.tests.utils.CountingCache',
+        'LOCATION': 'powerpages-counting',
+    }
+}
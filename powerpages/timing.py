@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+"""
+Timing of phases of page request processing.
+Results are exposed as `Server-Timing` response header (for staff users,
+if enabled by settings) and sent with `page_timed` signal.
+When disabled, the timer attached to the request does nothing.
+"""
+
+from __future__ import unicode_literals
+
+import collections
+import timeit
+
+from powerpages.models import Page
+from powerpages.settings import app_settings
+from powerpages.signals import page_timed
+
+
+class NullTimer(object):
+    """Timer used when timing is disabled"""
+
+    enabled = False
+
+    def phase(self, name):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        return False
+
+
+class PhaseTimer(object):
+    """Measures single execution of a phase"""
+
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+        self.start = None
+
+    def __enter__(self):
+        self.start = timeit.default_timer()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.timer.add(self.name, timeit.default_timer() - self.start)
+        return False
+
+
+class PageTimer(object):
+    """Collects durations (in seconds) of named phases"""
+
+    enabled = True
+
+    def __init__(self):
+        self.timings = collections.OrderedDict()
+
+    def phase(self, name):
+        """Context manager measuring given phase"""
+        return PhaseTimer(self, name)
+
+    def add(self, name, duration):
+        """Adds duration of the phase (phases may be executed many times)"""
+        self.timings[name] = self.timings.get(name, 0) + duration
+
+    def header_value(self):
+        """Value of `Server-Timing` HTTP header"""
+        return ', '.join(
+            '{0};dur={1:.3f}'.format(name, duration * 1000)
+            for name, duration in self.timings.items()
+        )
+
+
+null_timer = NullTimer()
+
+
+def start(request):
+    """Attaches new timer to the request"""
+    if app_settings.SERVER_TIMING or page_timed.has_listeners():
+        timer = PageTimer()
+    else:
+        timer = null_timer
+    request.powerpages_timer = timer
+    return timer
+
+
+def get_timer(request):
+    """Retrieves timer attached to the request"""
+    return getattr(request, 'powerpages_timer', null_timer)
+
+
+def finish(request, page, response):
+    """
+    Exposes timings of the request.
+    `page` is None for redirects answered by the routing table.
+    """
+    timer = get_timer(request)
+    if not timer.enabled:
+        return
+    if app_settings.SERVER_TIMING:
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_staff:
+            response['Server-Timing'] = timer.header_value()
+    page_timed.send(
+        Page, page=page, request=request, response=response,
+        timings=timer.timings
+    )
@@ -11,5 +11,7 @@ urlpatterns = [
     url('^powerpages-admin/switch-edit-mode/$', views.admin_switch_edit_mode,
         name='switch_edit_mode'),
     url(r'^sitemap\.xml', views.sitemap, name='sitemap'),
+    url(r'^sitemap-(?P<section>[\w-]+)-(?P<number>\d+)\.xml$',
+        views.sitemap_shard, name='sitemap_shard'),
     url('^(?P<path>[\S\s]*)$', views.page, name='page')
 ]
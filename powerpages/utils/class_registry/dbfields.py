@@ -2,6 +2,8 @@
 
 from __future__ import unicode_literals
 
+import copy
+
 import yaml
 
 from django.utils import six
@@ -9,6 +11,44 @@ from django import forms
 from django.db import models
 from django.core.serializers.pyyaml import DjangoSafeDumper
 
+from powerpages.utils.lru_cache import LRUCache
+from powerpages.settings import app_settings
+
+
+class ConfigLoader(getattr(yaml, 'CSafeLoader', yaml.SafeLoader)):
+    """
+    Safe YAML loader, using libyaml bindings (much faster than pure-Python
+    loader) if available. Accepts string tags emitted by Python 2 dumper.
+    """
+
+
+def register_string_tags(loader_class):
+    """Loads Python 2 string tags (`!!python/unicode`) as plain strings"""
+    for tag in ('python/unicode', 'python/str'):
+        loader_class.add_constructor(
+            'tag:yaml.org,2002:{0}'.format(tag),
+            loader_class.construct_yaml_str
+        )
+
+
+register_string_tags(ConfigLoader)
+
+# Parsed YAML documents, shared by all rows with the same raw config:
+parsed_configs = LRUCache(lambda: app_settings.CONFIG_CACHE_SIZE)
+_missing = object()
+
+
+def load_yaml(value):
+    """
+    Parses YAML document (safely), results are memoized per process.
+    Returned value is a copy, so memoized value is never mutated.
+    """
+    data = parsed_configs.get(value, _missing)
+    if data is _missing:
+        data = yaml.load(value, Loader=ConfigLoader)
+        parsed_configs.set(value, data)
+    return copy.deepcopy(data)
+
 
 class BaseRegistryItemField(models.CharField):
     """
@@ -54,6 +94,36 @@ class BaseRegistryItemField(models.CharField):
         setattr(cls, self.item_accessor_method_name, get_registry_item)
 
 
+class RawConfig(six.text_type):
+    """YAML document loaded from the database, not decoded yet"""
+
+
+class ConfigDescriptor(object):
+    """
+    Decodes raw YAML config on first access to the attribute,
+    decoded value is stored in the instance.
+    Loads the field from the database if it has been deferred.
+    """
+
+    def __init__(self, field):
+        self.field = field
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        attname = self.field.attname
+        data = instance.__dict__
+        if attname not in data:  # deferred
+            instance.refresh_from_db(fields=[attname])
+        value = data[attname]
+        if isinstance(value, RawConfig):
+            value = data[attname] = self.field.decode(value)
+        return value
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.field.attname] = value
+
+
 class BaseRegistryItemConfigField(models.TextField):
     """
     Model field for storing configuration in database as YAML documents.
@@ -65,17 +135,31 @@ class BaseRegistryItemConfigField(models.TextField):
 
     def from_db_value(self, value, expression, connection, context):
         """
-        Convert our YAML string to a Python object
-        after we load it from the DB.
+        Mark our YAML string loaded from the DB as raw config,
+        it's converted to a Python object on first access.
         """
         if value == "":
             return None
+        if isinstance(value, six.string_types):
+            return RawConfig(value)
+        return value
+
+    def decode(self, value):
+        """Convert our YAML string to a Python object"""
+        value = six.text_type(value)  # libyaml accepts exact types only
         try:
-            if isinstance(value, six.string_types):
-                return yaml.load(value)
+            return load_yaml(value)
         except ValueError:
-            pass
-        return value
+            return value
+
+    def pre_save(self, model_instance, add):
+        """Raw config (never accessed) is saved without decoding"""
+        value = model_instance.__dict__.get(self.attname)
+        if isinstance(value, RawConfig):
+            return value
+        return super(BaseRegistryItemConfigField, self).pre_save(
+            model_instance, add
+        )
 
     def get_db_prep_save(self, value, connection):
         """
@@ -106,7 +190,10 @@ class BaseRegistryItemConfigField(models.TextField):
         )
 
     def contribute_to_class(self, cls, name, *args, **kwargs):
-        """Apply get_page_processor_config method to model class"""
+        """
+        Apply decoding descriptor and get_page_processor_config method
+        to model class
+        """
 
         def get_registry_item_config(model_instance):
             return getattr(model_instance, name) or {}
@@ -114,6 +201,7 @@ class BaseRegistryItemConfigField(models.TextField):
         super(
             BaseRegistryItemConfigField, self
         ).contribute_to_class(cls, name, *args, **kwargs)
+        setattr(cls, self.attname, ConfigDescriptor(self))
         setattr(
             cls, self.config_accessor_method_name, get_registry_item_config
         )
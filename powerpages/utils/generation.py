@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+"""
+Generation counters stored in the shared cache.
+Process-local caches remember generation they have been built for
+and compare it with the shared value to find out that they are stale.
+"""
+
+from __future__ import unicode_literals
+
+import random
+
+from django.core.cache import cache
+
+
+def initial_generation():
+    """
+    Random starting value, so that counter lost by the shared cache
+    (eviction, flush) never matches value remembered by any process.
+    """
+    return random.randint(1, 2 ** 31)
+
+
+def get_generation(key):
+    """
+    Reads generation counter stored in the shared cache under given key,
+    initializes the counter if it's missing.
+    Returns None if cache backend is unable to store the counter
+    (eg. DummyCache).
+    """
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, initial_generation(), None)
+        generation = cache.get(key)
+    return generation
+
+
+def get_generations(keys):
+    """
+    Reads generation counters stored under given keys using single
+    `get_many` (missing counters are initialized).
+    Returns mapping: key -> generation (None if not available).
+    """
+    generations = cache.get_many(keys)
+    missing_keys = [key for key in keys if key not in generations]
+    if missing_keys:
+        for key in missing_keys:
+            cache.add(key, initial_generation(), None)
+        generations.update(cache.get_many(missing_keys))
+    return dict((key, generations.get(key)) for key in keys)
+
+
+def bump_generation(key):
+    """Increments generation counter stored under given key."""
+    try:
+        return cache.incr(key)
+    except ValueError:  # counter is missing
+        generation = initial_generation()
+        cache.set(key, generation, None)
+        return generation
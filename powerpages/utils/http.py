@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import calendar
+
+from django.utils import timezone
+from django.utils.http import parse_etags, unquote_etag, parse_http_date_safe
+
+
+def datetime_to_timestamp(value):
+    """Converts datetime (naive in default timezone or aware) to timestamp"""
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value, timezone.get_default_timezone())
+    return calendar.timegm(value.utctimetuple())
+
+
+def is_not_modified(request, etag=None, last_modified=None):
+    """
+    Checks if client's copy of the resource is valid, using
+    `If-None-Match` (preferred) or `If-Modified-Since` request headers.
+    `etag` is a non-quoted string, `last_modified` - timestamp.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        try:
+            etags = [unquote_etag(e) for e in parse_etags(if_none_match)]
+        except ValueError:
+            return False
+        return bool(etag) and (etag in etags or '*' in etags)
+    if_modified_since = request.META.get('HTTP_IF_MODIFIED_SINCE')
+    if if_modified_since:
+        if_modified_since = parse_http_date_safe(if_modified_since)
+        return bool(
+            last_modified and if_modified_since and
+            last_modified <= if_modified_since
+        )
+    return False
+
+
+def accepts_encoding(request, coding):
+    """
+    Checks if client accepts given content coding (eg. "gzip") according
+    to `Accept-Encoding` request header, respecting quality values
+    (`gzip;q=0` means that gzip is not acceptable).
+    """
+    accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    for item in accept_encoding.split(','):
+        params = item.split(';')
+        if params[0].strip().lower() != coding:
+            continue
+        quality = 1.0
+        for param in params[1:]:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        return quality > 0
+    return False
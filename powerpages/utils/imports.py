@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+from django.utils import six
+from django.utils.module_loading import import_string
+
+
+# Resolved callables, mapping: dotted path -> callable
+resolved_callables = {}
+
+
+def import_callable(dotted_path):
+    """
+    Imports callable by dotted path, result is memoized per process.
+    Raises ImportError if the path can not be resolved to a callable.
+    """
+    if not isinstance(dotted_path, six.string_types):
+        raise ImportError('{0!r} is not a dotted path'.format(dotted_path))
+    try:
+        return resolved_callables[dotted_path]
+    except KeyError:
+        obj = import_string(dotted_path)
+        if not callable(obj):
+            raise ImportError('"{0}" is not callable'.format(dotted_path))
+        resolved_callables[dotted_path] = obj
+        return obj
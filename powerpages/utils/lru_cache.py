@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import collections
+import threading
+
+
+class LRUCache(object):
+    """
+    Thread-safe, size-bounded mapping discarding least recently used items.
+    Counts hits and misses of `get` calls.
+    `maxsize` may be given as a callable, read whenever the size is checked
+    (eg. to follow changes of settings).
+    """
+
+    def __init__(self, maxsize):
+        self._maxsize = maxsize
+        self.data = collections.OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def maxsize(self):
+        """Maximum number of items"""
+        if callable(self._maxsize):
+            return self._maxsize()
+        return self._maxsize
+
+    def __len__(self):
+        return len(self.data)
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def get(self, key, default=None):
+        """Retrieves value and marks it as the most recently used"""
+        with self.lock:
+            try:
+                value = self.data.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self.data[key] = value
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """Stores value, discards the least recently used if needed"""
+        with self.lock:
+            self.data.pop(key, None)
+            self.data[key] = value
+            maxsize = self.maxsize
+            while len(self.data) > maxsize:
+                self.data.popitem(last=False)
+
+    def delete(self, key):
+        """Removes value (if present)"""
+        with self.lock:
+            self.data.pop(key, None)
+
+    def delete_matching(self, predicate):
+        """Removes all values with keys matching given predicate"""
+        with self.lock:
+            for key in [key for key in self.data if predicate(key)]:
+                del self.data[key]
+
+    def clear(self):
+        """Removes all values and resets counters"""
+        with self.lock:
+            self.data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Usage statistics"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self.data),
+            'maxsize': self.maxsize,
+        }
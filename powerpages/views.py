@@ -3,13 +3,14 @@
 from __future__ import unicode_literals
 
 from django import http
-from django.template.loader import render_to_string
 from django.contrib.auth.decorators import user_passes_test
-from django.core.cache import cache
 
-from powerpages.models import Page
-from powerpages import sitemap_config
-from powerpages import cachekeys
+from powerpages.routing import routing_table
+from powerpages.page_processors import RedirectProcessor
+from powerpages.settings import app_settings
+from powerpages import sitemap_cache
+from powerpages import sitemap_files
+from powerpages import timing
 
 
 def page(request, path):
@@ -21,13 +22,24 @@ def page(request, path):
     # if path doesn't end with slash and it's not a file name:
     if not path.endswith("/") and '.' not in path.split('/')[-1]:
         return http.HttpResponsePermanentRedirect(path + "/")
-    matching_pages = Page.objects.all().filter(url=path)
-    try:
-        page_obj = matching_pages[0]
-    except IndexError:
-        raise http.Http404
-    page_processor = page_obj.get_page_processor()
-    return page_processor.process_request(request)
+    with routing_table.pinned():
+        timer = timing.start(request)
+        with timer.phase('route'):
+            redirect = routing_table.get_redirect(path)
+            page_obj = None if redirect else routing_table.get_page(path)
+        if redirect:
+            response = RedirectProcessor.create_redirect_response(*redirect)
+            timing.finish(request, None, response)
+            return response
+        if page_obj is None:
+            raise http.Http404
+        with timer.phase('config'):
+            page_obj.get_page_processor_config()
+        with timer.phase('processor'):
+            page_processor = page_obj.get_page_processor()
+        response = page_processor.process_request(request)
+        timing.finish(request, page_obj, response)
+        return response
 
 
 @user_passes_test(lambda u: u.is_staff or u.is_superuser)
@@ -46,12 +58,42 @@ def admin_switch_edit_mode(request):
 
 def sitemap(request):
     """Simple XML sitemap view."""
-    sitemap_content = cache.get(cachekeys.SITEMAP_CONTENT)
-    if sitemap_content is None:
-        sitemap_content = render_to_string(
-            'powerpages/sitemap.xml',
-            context={'urlset': sitemap_config.sitemaps.urls(request)},
-            request=request
+    response = sitemap_files.file_response(
+        request, sitemap_files.SITEMAP_FILE_NAME
+    )
+    if response is not None:
+        return response
+    if app_settings.SITEMAP_STREAMING and not app_settings.SITEMAP_INDEX:
+        return http.StreamingHttpResponse(
+            sitemap_cache.stream_sitemap(request),
+            content_type='application/xml'
         )
-        cache.get(cachekeys.SITEMAP_CONTENT, sitemap_content)
-    return http.HttpResponse(sitemap_content, content_type='application/xml')
+    return http.HttpResponse(
+        sitemap_cache.get_sitemap(request), content_type='application/xml'
+    )
+
+
+def sitemap_shard(request, section, number):
+    """
+    Single shard of sitemap listed in sitemap index.
+    Falls back to CMS Page with the same URL if sitemap index is disabled
+    or there is no such shard.
+    """
+    path = sitemap_files.shard_file_name(section, number)
+    if not app_settings.SITEMAP_INDEX:
+        return page(request, path)
+    number = int(number)
+    response = sitemap_files.file_response(
+        request, sitemap_files.shard_file_name(section, number)
+    )
+    if response is not None:
+        return response
+    if app_settings.SITEMAP_STREAMING:
+        content = sitemap_cache.stream_shard(request, section, number)
+        response_class = http.StreamingHttpResponse
+    else:
+        content = sitemap_cache.get_shard(request, section, number)
+        response_class = http.HttpResponse
+    if content is None:
+        return page(request, path)
+    return response_class(content, content_type='application/xml')
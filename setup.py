@@ -99,6 +99,43 @@ class MakeMigrations(DjangoCommand):
         call_command('makemigrations', 'powerpages')
 
 
+class Benchmark(DjangoCommand):
+
+    description = 'run performance benchmarks on synthetic website'
+    user_options = [
+        ('nodes=', None, 'number of pages'),
+        ('depth=', None, 'max. depth of the tree of pages'),
+        ('template-size=', None, 'size of page template (characters)'),
+        ('alias-ratio=', None, 'fraction of pages having alias'),
+        ('redirect-ratio=', None, 'fraction of redirect pages'),
+        ('cache-ratio=', None, 'fraction of cached pages'),
+        ('requests=', None, 'number of measured requests'),
+        ('seed=', None, 'random seed'),
+        ('output=', 'o', 'JSON output file (default: stdout)'),
+    ]
+    int_options = ('nodes', 'depth', 'template_size', 'requests', 'seed')
+    float_options = ('alias_ratio', 'redirect_ratio', 'cache_ratio')
+
+    def initialize_options(self):
+        for name in self.int_options + self.float_options + ('output',):
+            setattr(self, name, None)
+
+    def finalize_options(self):
+        for name in self.int_options:
+            if getattr(self, name) is not None:
+                setattr(self, name, int(getattr(self, name)))
+        for name in self.float_options:
+            if getattr(self, name) is not None:
+                setattr(self, name, float(getattr(self, name)))
+
+    def _run(self):
+        from benchmarks.runner import main
+        main(**dict(
+            (name, getattr(self, name))
+            for name in self.int_options + self.float_options + ('output',)
+        ))
+
+
 setup(
     name='django-powerpages',
     version='0.0.8',
@@ -129,7 +166,11 @@ setup(
     install_requires=[
         'PyYAML==3.11',
     ],
-    packages=find_packages(),
+    packages=find_packages(exclude=['benchmarks', 'benchmarks.*']),
     include_package_data=True,
-    cmdclass={'test': Test, 'makemigrations': MakeMigrations},
+    cmdclass={
+        'test': Test,
+        'makemigrations': MakeMigrations,
+        'benchmark': Benchmark,
+    },
 )